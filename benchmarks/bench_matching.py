@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import random
+import timeit
+
+from prompter import _colors
+from prompter import _oklab
+
+QUERIES = 2000
+REPEAT = 5
+
+
+def main():
+    random.seed(0)
+    queries = [random.randrange(0x1000000) for _ in range(QUERIES)]
+
+    channel = _colors.SnapKernel(
+        _colors.XtermColor._reftbl,
+        grays={192},
+        colors1={0, 128},
+        colors2={0, 255},
+        extra_colors=frozenset(_colors.Cube6XtermColor.values),
+        extra_grays=frozenset(range(8, 239, 10)),
+    )
+    oklab = _oklab.PaletteIndex(_colors.XtermColor._reftbl)
+
+    def run_uncached():
+        oklab.nearest.cache_clear()
+        for packed in queries:
+            oklab(packed)
+
+    def run_cached():
+        for packed in queries:
+            oklab(packed)
+
+    cases = [
+        ('per-channel snap', lambda: [channel(p) for p in queries]),
+        ('oklab grid (uncached)', run_uncached),
+        ('oklab grid (cached)', run_cached),
+        ('oklab brute force', lambda: [oklab.brute_force(p) for p in queries]),
+    ]
+
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+        print('{name:<22} {usec:8.2f} us/query'.format(
+            name=name,
+            usec=best / QUERIES * 1e6
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import timeit
+
+from prompter import _context
+from prompter import _metrics
+from prompter import config
+from prompter import make_prompt
+
+WORKERS = (1, 2, 4, 8, 16)
+REPEAT = 5
+IO_SEGMENTS = 4
+IO_DELAY = 0.02
+DEFAULT_LAYOUT = ('mem_sys', 'user_host_path', 'test')
+
+METRICS = _metrics.FixtureBackend([
+    _metrics.SystemSnapshot(
+        mem_total=16 << 20,
+        mem_free=8 << 20,
+        swap_total=4 << 20,
+        swap_free=4 << 20,
+        load_avg=(0.5, 0.25, 0.125),
+        cpu_count=8,
+        captured=0.0
+    ),
+])
+
+
+def register_io_segments():
+    names = []
+
+    for ndx in range(IO_SEGMENTS):
+        name = 'io{ndx}'.format(ndx=ndx)
+
+        make_prompt.segments.register(name, doc='Simulated I/O segment.')(
+            lambda prompt: time.sleep(IO_DELAY) or ''
+        )
+        names.append(name)
+
+    return tuple(names)
+
+
+def run(layout, workers):
+    prompt = make_prompt.Prompt(
+        _context.RenderContext.create(
+            next(iter(config.settings.user.normal)),
+            next(iter(config.settings.server)),
+            metrics=METRICS
+        ),
+        workers=workers
+    )
+    prompt.register_attr(
+        'template',
+        lambda: '\n'.join(
+            '{{{name}}}'.format(name=name)
+            for name in layout
+        )
+    )
+
+    return prompt.raw_prompt, prompt.segment_timings
+
+
+def main():
+    io_layout = DEFAULT_LAYOUT + register_io_segments()
+
+    print('cpus: {cpus}'.format(cpus=os.cpu_count()))
+
+    for name, layout in [
+        ('default layout', DEFAULT_LAYOUT),
+        ('with simulated I/O', io_layout),
+    ]:
+        expected, timings = run(layout, 1)
+
+        for workers in WORKERS:
+            assert run(layout, workers)[0] == expected
+
+            best = min(timeit.repeat(
+                lambda: run(layout, workers),
+                number=1,
+                repeat=REPEAT
+            ))
+            print('{name:<20} workers={workers:<3} {msec:8.2f} ms'.format(
+                name=name,
+                workers=workers,
+                msec=best * 1e3
+            ))
+
+    print('slowest segments (serial, default layout):')
+    expected, timings = run(DEFAULT_LAYOUT, 1)
+
+    for segment, seconds in sorted(
+        timings.items(),
+        key=lambda item: -item[1]
+    )[:5]:
+        print('    {segment:<16} {msec:8.3f} ms'.format(
+            segment=segment,
+            msec=seconds * 1e3
+        ))
+
+
+if __name__ == '__main__':
+    main()
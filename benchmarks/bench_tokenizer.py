@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import random
+import re
+import timeit
+
+from prompter import _ansi
+from prompter import ansi
+from prompter import colors
+
+SIZES = (1024, 8192, 65536)
+REPEAT = 5
+
+NAIVE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]|\x1b\][^\x07]*\x07')
+
+
+def gen_text(size):
+    random.seed(size)
+    words = ['alpha', 'beta', 'gamma', 'δέλτα', '世界', 'epsilon', ' ', '\t']
+    pieces = []
+    length = 0
+
+    while length < size:
+        seq = random.choice([
+            lambda: ansi.seq.ColorText(random.randrange(256)),
+            lambda: ansi.seq.Color24Back(
+                colors.from_packed(random.randrange(0x1000000))
+            ),
+            lambda: ansi.seq.Bold() + ansi.seq.AnsiColorText(
+                random.randrange(16)
+            ),
+            lambda: ansi.seq.Reset(),
+        ])()
+        piece = ''.join([
+            '\\[',
+            str(seq),
+            '\\]',
+            ''.join(random.choice(words) for _ in range(4)),
+        ])
+        pieces.append(piece)
+        length += len(piece)
+
+    return ''.join(pieces)
+
+
+def main():
+    for size in SIZES:
+        text = gen_text(size)
+
+        cases = [
+            ('tokenize', lambda: list(_ansi.tokenize(text))),
+            ('visible_width', lambda: _ansi.visible_width(text)),
+            ('strip', lambda: _ansi.strip_ansi(text)),
+            ('naive regex strip', lambda: NAIVE.sub('', text)),
+        ]
+
+        for name, func in cases:
+            best = min(timeit.repeat(func, number=10, repeat=REPEAT)) / 10
+            print(' '.join([
+                '{size:>6} chars {name:<18}',
+                '{usec:10.1f} us {mbps:8.1f} MB/s',
+            ]).format(
+                size=len(text),
+                name=name,
+                usec=best * 1e6,
+                mbps=len(text.encode('utf-8')) / best / 1e6
+            ))
+
+
+if __name__ == '__main__':
+    main()
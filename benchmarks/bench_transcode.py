@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import io
+import random
+import timeit
+
+from prompter import _transcode
+
+LINES = 100000
+REPEAT = 3
+
+LEVELS = [
+    b'1;31',
+    b'38;5;208',
+    b'38;2;40;160;220',
+    b'48;5;22;38;5;231',
+    b'0',
+]
+
+
+def gen_log(colored_every):
+    random.seed(colored_every)
+    lines = []
+
+    for ndx in range(LINES):
+        line = b''.join([
+            b'2015-06-01 12:00:',
+            str(ndx % 60).encode('ascii').rjust(2, b'0'),
+            b' worker-',
+            str(ndx % 8).encode('ascii'),
+            b' handled request id=',
+            str(ndx).encode('ascii'),
+            b' status=ok\n',
+        ])
+
+        if ndx % colored_every == 0:
+            line = b''.join([
+                b'\x1b[',
+                random.choice(LEVELS),
+                b'm',
+                line[:19],
+                b'\x1b[0m',
+                line[19:],
+            ])
+
+        lines.append(line)
+
+    return b''.join(lines)
+
+
+def main():
+    for name, data in [
+        ('every line colored', gen_log(1)),
+        ('1 in 10 colored', gen_log(10)),
+        ('uncolored', gen_log(LINES + 1)),
+    ]:
+        for depth in _transcode.DEPTHS:
+            def run():
+                _transcode.transcode(io.BytesIO(data), io.BytesIO(), depth)
+
+            best = min(timeit.repeat(run, number=1, repeat=REPEAT))
+            print('{name:<20} depth={depth:<4} {mbps:10.1f} MB/s'.format(
+                name=name,
+                depth=depth,
+                mbps=len(data) / best / 1e6
+            ))
+
+
+if __name__ == '__main__':
+    main()
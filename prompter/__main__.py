@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import argparse
+
+
+def run_prompt(args):
+    from prompter import make_prompt
+
+    make_prompt.Prompt.get_prompt(dual=getattr(args, 'dual', False))
+
+
+def run_transcode(args):
+    from prompter import _transcode
+
+    _transcode.main(args)
+
+
+def run_fleet(args):
+    from prompter import _fleet
+
+    _fleet.main(args)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='prompter',
+        description='The pythonic way to make shell prompts.'
+    )
+    parser.set_defaults(func=run_prompt)
+
+    commands = parser.add_subparsers(title='commands')
+
+    prompt = commands.add_parser(
+        'prompt',
+        help='Print the PS1 prompt for the current user and host (default).'
+    )
+    prompt.add_argument(
+        '--dual',
+        action='store_true',
+        help=' '.join([
+            'Print a shell snippet that sets PS1 for both xterm and',
+            '16-color terminals, chosen by $TERM when it is evaluated.'
+        ])
+    )
+    prompt.set_defaults(func=run_prompt)
+
+    transcode = commands.add_parser(
+        'transcode',
+        help=' '.join([
+            'Re-target the colors in a stream on stdin to a terminal with',
+            'fewer colors.'
+        ])
+    )
+    transcode.add_argument(
+        '--depth',
+        type=int,
+        choices=(256, 16),
+        default=256,
+        help='The number of colors the target terminal supports.'
+    )
+    transcode.set_defaults(func=run_transcode)
+
+    fleet = commands.add_parser(
+        'fleet',
+        help=' '.join([
+            'Write a PS1 snippet for every host and user in the settings,',
+            'as OUT/<host>/<user>.ps1.'
+        ])
+    )
+    fleet.add_argument(
+        '--out',
+        required=True,
+        help='The directory the prompts are written to.'
+    )
+    fleet.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='The number of processes to render with (default: CPU count).'
+    )
+    fleet.set_defaults(func=run_fleet)
+
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,17 +3,75 @@
 import collections
 import enum
 import functools
+import inspect
+import re
+import threading
+import unicodedata
 
+from prompter import _transcode
 from prompter import config
 from prompter import colors
 
 ESC = '\033'
+ST = ''.join([ESC, '\\'])
+BASH_ESC = '\\e'
 
 
 def raise_(e):
     raise e
 
 
+@functools.lru_cache(maxsize=4096)
+def encode_fragment(text, bash=False):
+    if bash:
+        text = text.replace(ESC, BASH_ESC)
+
+    return text.encode('utf-8')
+
+
+class ByteSink:
+    def __init__(self, out, offset=0):
+        self.out = out
+        self.offset = offset
+
+        if hasattr(out, 'write'):
+            self.put = out.write
+
+        elif isinstance(out, memoryview):
+            self.put = self.put_view
+
+        else:
+            self.put = out.extend
+
+    def put_view(self, data):
+        end = self.offset + len(data)
+        self.out[self.offset:end] = data
+        self.offset = end
+
+    def write(self, data):
+        self.put(data)
+
+
+class FragmentEncoder:
+    def __init__(self, sink, bash=False):
+        self.sink = sink
+        self.bash = bash
+
+    def write(self, text):
+        self.sink.write(encode_fragment(text, self.bash))
+
+
+def get_sink(out):
+    return out if isinstance(out, ByteSink) else ByteSink(out)
+
+
+def to_bash(sequence):
+    if isinstance(sequence, (AnsiList, AnsiSequence)):
+        return sequence.to_bash()
+
+    return str(sequence).replace(ESC, BASH_ESC)
+
+
 class EraseCode(enum.IntEnum):
     End = 0
     Start = 1
@@ -85,50 +143,132 @@ class AnsiList(collections.UserList):
     def __repr__(self):
         return 'AnsiList({items!r})'.format(items=self.data)
 
-    def __str__(self):
+    def render_into(self, buffer):
+        write = buffer.write if hasattr(buffer, 'write') else buffer.append
         last_code = None
+        last_csi = None
 
-        ret = ''
         for item in self:
             if last_code is None:
-                ret = ''.join([
-                    ret,
-                    AnsiSequence.CSI,
-                    ';'.join(str(piece) for piece in item.payload)
-                ])
-
-            elif last_code == item.code:
-                ret = ''.join([
-                    ret,
-                    (
-                        ''.join([
-                            ';',
-                            ';'.join(str(piece) for piece in item.payload)
-                        ])
-                        if item.payload
-                        else ''
-                    )
-                ])
-
-            elif last_code != item.code:
-                ret = ''.join([
-                    ret,
-                    last_code,
-                    AnsiSequence.CSI,
-                    ';'.join(str(piece) for piece in item.payload)
-                ])
+                write(item.CSI)
+                write(item.params)
+
+            elif last_code == item.code and last_csi == item.CSI:
+                if item.payload:
+                    write(';')
+                    write(item.params)
+
+            else:
+                write(last_code)
+                write(item.CSI)
+                write(item.params)
 
             last_code = item.code
+            last_csi = item.CSI
+
+        if last_code is not None:
+            write(last_code)
+
+        return buffer
+
+    def __str__(self):
+        return ''.join(self.render_into([]))
+
+    def to_bash(self):
+        return str(self).replace(ESC, BASH_ESC)
 
-        return ''.join([ret, last_code if last_code is not None else ''])
+    def to_bytes(self, bash=False):
+        return bytes(self.emit_into(bytearray(), bash).out)
+
+    def emit_into(self, out, bash=False):
+        sink = get_sink(out)
+        self.render_into(FragmentEncoder(sink, bash))
+
+        return sink
 
 
 class AnsiSequence:
     CSI = ''.join([ESC, '['])
 
-    def __init__(self, *payload, code):
-        self.__code = code
-        self.__payload = tuple(payload)
+    __slots__ = (
+        '__code',
+        '__payload',
+        '__params',
+        '__str',
+        '__bytes',
+        '__bash',
+    )
+
+    intern_size = 1024
+    interned = collections.OrderedDict()
+    intern_lock = threading.Lock()
+
+    def __new__(cls, *payload, code):
+        table = AnsiSequence.interned
+        key = (cls, code, tuple((type(item), item) for item in payload))
+
+        with AnsiSequence.intern_lock:
+            if key in table:
+                table.move_to_end(key)
+                return table[key]
+
+        self = super().__new__(cls)
+        params = ';'.join(str(item) for item in payload)
+
+        object.__setattr__(self, '_AnsiSequence__code', code)
+        object.__setattr__(self, '_AnsiSequence__payload', tuple(payload))
+        object.__setattr__(self, '_AnsiSequence__params', params)
+        object.__setattr__(
+            self,
+            '_AnsiSequence__str',
+            ''.join([cls.CSI, params, code])
+        )
+        object.__setattr__(self, '_AnsiSequence__bytes', None)
+        object.__setattr__(self, '_AnsiSequence__bash', None)
+
+        with AnsiSequence.intern_lock:
+            self = table.setdefault(key, self)
+
+            while len(table) > AnsiSequence.intern_size:
+                table.popitem(last=False)
+
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "can't set attribute {name} on an immutable {cls}".format(
+                name=name,
+                cls=type(self).__name__
+            )
+        )
+
+    def __delattr__(self, name):
+        raise AttributeError(
+            "can't delete attribute {name} on an immutable {cls}".format(
+                name=name,
+                cls=type(self).__name__
+            )
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, AnsiSequence)
+            and self.CSI == other.CSI
+            and self.__code == other.code
+            and self.__payload == other.payload
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.CSI, self.__code, self.__payload))
+
+    def __reduce__(self):
+        return (
+            functools.partial(type(self), code=self.__code),
+            self.__payload
+        )
 
     @property
     def code(self):
@@ -138,6 +278,19 @@ class AnsiSequence:
     def payload(self):
         return self.__payload
 
+    @property
+    def params(self):
+        return self.__params
+
+    def render_into(self, buffer):
+        if hasattr(buffer, 'write'):
+            buffer.write(self.__str)
+
+        else:
+            buffer.append(self.__str)
+
+        return buffer
+
     def __add__(self, other):
         if not other:
             ret = self
@@ -193,11 +346,29 @@ class AnsiSequence:
         return ret
 
     def __str__(self):
-        return ''.join([
-            AnsiSequence.CSI,
-            ';'.join(str(item) for item in self.payload),
-            self.code
-        ])
+        return self.__str
+
+    def __bytes__(self):
+        return self.to_bytes()
+
+    def to_bash(self):
+        return self.__str.replace(ESC, BASH_ESC)
+
+    def to_bytes(self, bash=False):
+        slot = '_AnsiSequence__bash' if bash else '_AnsiSequence__bytes'
+        ret = getattr(self, slot)
+
+        if ret is None:
+            ret = encode_fragment(self.__str, bash)
+            object.__setattr__(self, slot, ret)
+
+        return ret
+
+    def emit_into(self, out, bash=False):
+        sink = get_sink(out)
+        sink.write(self.to_bytes(bash))
+
+        return sink
 
     def __repr__(self):
         payload_params = (
@@ -224,726 +395,1215 @@ class AnsiSequence:
         ])
 
 
-class SequenceConfig(config.Base):
-    def __init__(self):
-        self.register_attr(
-            'CursorUp',
-            lambda: lambda lines=1: AnsiSequence(lines, code='A'),
-            """
-            Moves cursor up by *lines* lines (1 by default).
-
-            :param lines: Number of lines to move the cursor up
-            :type lines: integer
-            """
-        )
+class OscSequence(AnsiSequence):
+    CSI = ''.join([ESC, ']'])
 
-        self.register_attr(
-            'CursorDown',
-            lambda: lambda lines=1: AnsiSequence(lines, code='B'),
-            """
-            Moves cursor down by *lines* lines (1 by default).
-
-            :param lines: Number of lines to move the cursor down
-            :type lines: integer
-            """
-        )
+    __slots__ = ()
 
-        self.register_attr(
-            'CursorRight',
-            lambda: lambda rows=1: AnsiSequence(rows, code='C'),
-            """
-            Moves cursor right by *rows* rows (1 by default).
-
-            :param rows: Number of rows to move the cursor right
-            :type rows: integer
-            """
-        )
 
-        self.register_attr(
-            'CursorLeft',
-            lambda: lambda rows=1: AnsiSequence(rows, code='D'),
-            """
-            Moves cursor left by *rows* rows (1 by default).
-
-            :param rows: Number of rows to move the cursor left
-            :type rows: integer
-            """
-        )
+SGR_OFF = {
+    1: 22,
+    2: 22,
+    3: 23,
+    4: 24,
+    5: 25,
+    6: 25,
+    7: 27,
+    8: 28,
+    9: 29,
+}
 
-        self.register_attr(
-            'CursorDownHome',
-            lambda: lambda lines=1: AnsiSequence(lines, code='E'),
-            """
-            Moves cursor to beginning of the line *lines* (1 by default) lines
-            down.
-
-            :param lines: Number of lines to move the cursor down
-            :type lines: integer
-            """
-        )
 
-        self.register_attr(
-            'CursorUpHome',
-            lambda: lambda lines=1: AnsiSequence(lines, code='F'),
-            """
-            Moves cursor to beginning of the line *lines* (1 by default) lines
-            up.
-
-            :param lines: Number of lines to move the cursor up
-            :type lines: integer
-            """
-        )
+class SgrState(collections.namedtuple('SgrState', 'attrs fore back')):
+    __slots__ = ()
 
-        self.register_attr(
-            'ColSet',
-            lambda: lambda col: AnsiSequence(col, code='G'),
-            """
-            Moves the cursor to column *col* (absolute, 1-based).
-
-            :param col: The column to move the cursor to.
-            :type col: integer
-            """
-        )
+    def __new__(cls, attrs=frozenset(), fore=None, back=None):
+        return super().__new__(cls, frozenset(attrs), fore, back)
 
-        self.register_attr(
-            'PosSet',
-            lambda: lambda row, col: AnsiSequence(row, col, code='H'),
-            """
-            Set cursor position. The values *row* and *col* are 1-based.
-
-            :param row: The row to move the cursor to.
-            :type row: integer
-            :param col: The column to move the cursor to.
-            :type col: integer
-            """
-        )
+    @staticmethod
+    def color(code, params):
+        if code in (38, 48) and params:
+            mode = params.pop(0)
 
-        self.register_attr(
-            'EraseScreen',
-            lambda: lambda ec=EraseCode.End: AnsiSequence(
-                (
-                    ec.value
-                    if isinstance(ec, EraseCode)
-                    else ec
-                    if ec in range(3)
-                    else raise_(
-                        ValueError(
-                            ' '.join([
-                                'ec must be an EraseCode or integer in the',
-                                'range 0-2, and not {ec!r}.'
-                            ]).format(
-                                ec=ec
-                            )
-                        )
-                    )
-                ),
-                code='J'
-            ),
-            """
-            Erase display.
-
-            * When *ec* is :py:attr:`EraseCode.End` or missing: from cursor toi
-                end of display.
-            * When *ec* is :py:attr:`EraseCode.Start`: erase from start to
-                cursor.
-            * When *ec* is :py:attr:`EraseCode.All`: erase whole display and
-                moves cursor to upper-left corner.
-
-            :param ec: The code that determines how the display erasing will
-                work.
-            :type ec: :py:class:`EraseCode`
-            """
-        )
+            if mode == 5 and params:
+                return (code, mode, params.pop(0))
 
-        self.register_attr(
-            'EraseLine',
-            lambda: lambda ec=EraseCode.End: AnsiSequence(
-                (
-                    ec.value
-                    if isinstance(ec, EraseCode)
-                    else ec
-                    if ec in range(3)
-                    else raise_(
-                        ValueError(
-                            ' '.join([
-                                'ec must be an EraseCode or an integer in the',
-                                'range 0-2, and not {ec!r}.'
-                            ]).format(
-                                ec=ec
-                            )
-                        )
-                    )
-                ),
-                code='K'
-            ),
-            """
-            Erase line.
-
-            * When *ec* is :py:attr:`EraseCode.End` or missing: from cursor to
-                end of line.
-            * When *ec* is :py:attr:`EraseCode.Start`: erase from start of line
-                to cursor.
-            * When *ec* is :py:attr:`EraseCode.All`: erase whole line and moves
-                cursor to first column.
-
-            :param ec: The code that determines how the line erasing will work.
-            :type ec: :py:class:`EraseCode`
-            """
-        )
+            elif mode == 2 and len(params) >= 3:
+                return (code, mode) + tuple(params.pop(0) for _ in range(3))
 
-        self.register_attr(
-            'InsertLine',
-            lambda: lambda n=1: AnsiSequence(n, code='L'),
-            """
-            Insert *n* (default 1) lines before current, scroll part of screen
-            from current line to bottom.
-
-            :param n: Number of lines to insert
-            :type n: integer
-            """
-        )
+            raise ValueError('Malformed extended color')
 
-        self.register_attr(
-            'DeleteLine',
-            lambda: lambda n=1: AnsiSequence(n, code='M'),
-            """
-            Delete *n* (default 1) lines including current.
-
-            :param n: Number of lines to delete
-            :type n: integer
-            """
-        )
+        return (code,)
 
-        self.register_attr(
-            'ScrollUp',
-            lambda: lambda lines: AnsiSequence(lines, code='S'),
-            """
-            Scroll screen (whole buffer) up by *lines*. New lines are added at
-            the bottom.
-
-            :param lines: Number of lines to scroll the screen up by.
-            :type lines: integer
-            """
-        )
+    def apply(self, params):
+        attrs = set(self.attrs)
+        fore = self.fore
+        back = self.back
+        params = list(params)
 
-        self.register_attr(
-            'ScrollDown',
-            lambda: lambda lines: AnsiSequence(lines, code='T'),
-            """
-            Scroll screen (whole buffer) down by *lines*. New lines are added
-            at the top.
-
-            :param lines: Number of lines to scroll the screen down by.
-            :type lines: integer
-            """
-        )
+        while params:
+            code = params.pop(0)
 
-        self.register_attr(
-            'EraseChar',
-            lambda: lambda n=1: AnsiSequence(n, code='X'),
-            """
-            Erase *n* (default 1) characters from cursor (fill with spaces and
-            default attributes).
-
-            :param n: Number of characters to delete
-            :type n: integer
-            """
-        )
+            if code == 0:
+                attrs.clear()
+                fore = back = None
 
-        self.register_attr(
-            'ScrollSet',
-            lambda: lambda a=None, b=None: (
-                AnsiSequence(a, b, code='r')
-                if a is not None and b is not None
-                else AnsiSequence(code='r')
-            ),
-            """
-            Set scrolling region from top=*a* to bottom=*b*. The values *a* and
-            *b* are 1-based. *Omit values to reset region.*
-
-            :param a: The top row position for the scrolling region (absolute
-                value)
-            :type a: integer
-            :param b: The bottom row position for the scrolling region
-                (absolute value)
-            :type b: integer
-            """
-        )
+            elif code in SGR_OFF:
+                attrs.add(code)
 
-        self.register_attr(
-            'PosSave',
-            lambda: lambda: AnsiSequence(code='s'),
-            """
-            Save vursor position (cannot be nested).
-            """
-        )
+            elif code == 22:
+                attrs -= {1, 2}
 
-        self.register_attr(
-            'PosRestore',
-            lambda: lambda: AnsiSequence(code='u'),
-            """
-            Restore cursor position.
-            """
-        )
+            elif code in (23, 24, 27, 28, 29):
+                attrs.discard(code - 20)
 
-        self.register_attr(
-            'GetGTC',
-            lambda: lambda: AnsiSequence(code='>c'),
-            """
-            Report "ESC > 67 ; build ; 0 c"
-            """
-        )
+            elif code == 25:
+                attrs -= {5, 6}
 
-        self.register_attr(
-            'GetC',
-            lambda: lambda: AnsiSequence(code='c'),
-            """
-            Report "ESC [ ? 1 ; 2 c"
-            """
-        )
+            elif 30 <= code <= 37 or 90 <= code <= 97 or code == 38:
+                fore = self.color(code, params)
 
-        self.register_attr(
-            'GetStatus',
-            lambda: lambda: AnsiSequence(5, code='n'),
-            """
-            Report status as "CSI 0 n" (OK)
-            """
-        )
+            elif code == 39:
+                fore = None
 
-        self.register_attr(
-            'GetPos',
-            lambda: lambda: AnsiSequence(6, code='n'),
-            """
-            Report Cursor Position as "ESC [ row ; col R"
-            """
-        )
+            elif 40 <= code <= 47 or 100 <= code <= 107 or code == 48:
+                back = self.color(code, params)
 
-        self.register_attr(
-            'GetTextArea',
-            lambda: lambda: AnsiSequence(18, code='t'),
-            """
-            Report the size of the text area in characters as
-            "ESC [ 8 ; height ; width t"
-            """
-        )
+            elif code == 49:
+                back = None
 
-        self.register_attr(
-            'GetScreen',
-            lambda: lambda: AnsiSequence(19, code='t'),
-            """
-            Report the size of the screen in characters as
-            "ESC [ 9 ; height ; width t"
-            """
-        )
+            else:
+                raise ValueError('Unsupported SGR code {}'.format(code))
 
-        self.register_attr(
-            'GetTitle',
-            lambda: lambda: AnsiSequence(21, code='t'),
-            """
-            Report window's title as "ESC ] l title ESC \\"
-            """
-        )
+        return type(self)(attrs, fore, back)
 
-        self.register_attr(
-            'LineWrapOn',
-            lambda: lambda col=80: AnsiSequence(7, col, code='h'),
-            """
-            Enable lines wrapping at column position. If *col* (1-based) is
-            absent, wrap at column 80.
-
-            :param col: The column to wrap lines at.
-            :type col: integer
-            """
-        )
+    @property
+    def codes(self):
+        ret = sorted(self.attrs)
 
-        self.register_attr(
-            'LineWrapOff',
-            lambda: lambda: AnsiSequence(7, code='l'),
-            """
-            Disables line wrapping. Lines wrap at the end of screen buffer.
-            """
-        )
+        if self.fore is not None:
+            ret.extend(self.fore)
 
-        self.register_attr(
-            'CursorShow',
-            lambda: lambda: AnsiSequence(25, code='h'),
-            """
-            Show text cursor.
-            """
-        )
+        if self.back is not None:
+            ret.extend(self.back)
 
-        self.register_attr(
-            'CursorHide',
-            lambda: lambda: AnsiSequence(25, code='l'),
-            """
-            Hide text cursor.
-            """
-        )
+        return ret
 
-        self.register_attr(
-            'SetTitle',
-            ''.join([ESC, '\\']),
-            lambda: lambda txt: AnsiSequence(
-                ''.join([
-                    '"',
-                    txt.encode('string_escape').replace('"', '\\"'),
-                    '"',
-                ]),
-                code=''.join([ESC, '\\'])
-            ),
-            """
-            Set console window title to *txt*.
-
-            :param txt: The text to change the console window's title to.
-            :type txt: string
-            """
-        )
+    def diff(self, target):
+        if target == self:
+            return []
 
-        self.register_attr(
-            'Reset',
-            lambda: lambda: AnsiSequence(0, code='m'),
-            """
-            Reset current attributes.
-            """
-        )
+        if target == SgrState():
+            return [0]
 
-        self.register_attr(
-            'Bold',
-            lambda: lambda: AnsiSequence(1, code='m'),
-            """
-            Set Bright or Bold.
-            """
-        )
+        full = [0] + target.codes
 
-        self.register_attr(
-            'UnBold',
-            lambda: lambda: AnsiSequence(2, code='m'),
-            """
-            Unset Bright or Bold.
+        changes = []
+        removed = self.attrs - target.attrs
+        added = set(target.attrs - self.attrs)
 
-            .. warning::
+        for code in sorted({SGR_OFF[code] for code in removed}):
+            changes.append(code)
 
-                This is unreliable. It is better to use
-                :py:attr:`Sequence.Reset`
-            """
-        )
+            if code == 22:
+                added |= target.attrs & {1, 2}
 
-        self.register_attr(
-            'Italic',
-            lambda: lambda: AnsiSequence(3, code='m'),
-            """
-            Set Italic or Inverse.
-            """
-        )
+        changes.extend(sorted(added))
 
-        self.register_attr(
-            'Underline',
-            lambda: lambda: AnsiSequence(4, code='m'),
-            """
-            Set Underline or Back.
-            """
-        )
+        if target.fore != self.fore:
+            changes.extend(target.fore or (39,))
 
-        self.register_attr(
-            'Blink',
-            lambda: lambda: AnsiSequence(5, code='m'),
-            """
-            Set Blink or Underline.
-            """
+        if target.back != self.back:
+            changes.extend(target.back or (49,))
+
+        if len(sgr_params(changes)) <= len(sgr_params(full)):
+            return changes
+
+        return full
+
+
+class SgrResult(collections.namedtuple('SgrResult', 'text before after')):
+    __slots__ = ()
+
+    @property
+    def saved(self):
+        return self.before - self.after
+
+
+def sgr_params(codes):
+    return ';'.join(str(code) for code in codes)
+
+
+def sgr_sequence(codes, bash=False):
+    return ''.join([
+        BASH_ESC if bash else ESC,
+        '[',
+        sgr_params(codes),
+        'm',
+    ])
+
+
+def parse_sgr_block(content):
+    codes = []
+
+    for match in SGR_SEQUENCE.finditer(content):
+        codes.extend(
+            int(param) if param else 0
+            for param in match.group(1).split(';')
         )
 
-        self.register_attr(
-            'Inverse',
-            lambda: lambda: AnsiSequence(7, code='m'),
-            """
-            Set Inverse.
-            """
+    return codes
+
+
+def sgr_commands(codes):
+    ret = []
+    params = list(codes)
+
+    while params:
+        code = params.pop(0)
+        ret.append(SgrState.color(code, params))
+
+    return ret
+
+
+def optimize_sgr(text, start='\\[', end='\\]', bash=False):
+    """
+    Rewrite the SGR escapes in a prompt so that each run of visible text is
+    preceded by the minimal change from the previous attribute state.
+
+    Consecutive non-printing blocks made only of SGR sequences are merged,
+    redundant resets are dropped, and any other non-printing block (such as
+    a ``$(...)`` substitution) is kept verbatim and treated as a barrier
+    after which the terminal state is unknown until the next full reset.
+
+    Both the raw ``ESC`` and the bash ``\\e`` forms are recognized; *bash*
+    selects the form used for the rewritten sequences.
+    """
+    out = []
+    known = None
+    state = SgrState()
+    pending = []
+    pos = 0
+
+    def flush():
+        nonlocal known, pending
+
+        if known is not None:
+            codes = known.diff(state)
+            known = state
+
+        elif pending[:1] == [0]:
+            codes = [0] + state.codes
+            known = state
+
+        else:
+            codes = pending
+
+        pending = []
+
+        if codes:
+            out.extend([start, sgr_sequence(codes, bash), end])
+
+    blocks = re.compile(
+        '{start}(.*?){end}'.format(start=re.escape(start), end=re.escape(end)),
+        re.DOTALL
+    )
+
+    for match in blocks.finditer(text):
+        visible = text[pos:match.start()]
+        content = match.group(1)
+        pos = match.end()
+
+        if visible:
+            flush()
+            out.append(visible)
+
+        if content and SGR_BLOCK.fullmatch(content):
+            codes = parse_sgr_block(content)
+
+            try:
+                state = state.apply(codes)
+
+            except ValueError:
+                flush()
+                out.append(match.group(0))
+                known = None
+                continue
+
+            commands = sgr_commands(codes)
+            resets = [
+                ndx
+                for ndx, command in enumerate(commands)
+                if command == (0,)
+            ]
+
+            if resets:
+                pending = [
+                    code
+                    for command in commands[resets[-1]:]
+                    for code in command
+                ]
+            else:
+                pending.extend(codes)
+
+        else:
+            flush()
+            out.append(match.group(0))
+            known = None
+
+    visible = text[pos:]
+    flush()
+    out.append(visible)
+
+    ret = ''.join(out)
+
+    return SgrResult(
+        ret,
+        len(text.encode('utf-8')),
+        len(ret.encode('utf-8'))
+    )
+
+
+SGR_SEQUENCE = re.compile(
+    '(?:{esc}|{bash_esc})\\[([0-9;]*)m'.format(
+        esc=re.escape(ESC),
+        bash_esc=re.escape(BASH_ESC)
+    )
+)
+SGR_BLOCK = re.compile('(?:{})+'.format(SGR_SEQUENCE.pattern))
+
+
+class Marker(enum.Enum):
+    Start = '\\['
+    End = '\\]'
+
+
+class RawEscape(str):
+    __slots__ = ()
+
+
+TOKEN = re.compile(
+    r'''
+    (?P<csi>
+        (?:{esc}|{bash_esc})\[
+        (?P<csi_params>[0-?]*)
+        (?P<csi_code>[\ -/]*[@-~])
+    )
+    | (?P<osc>
+        (?:{esc}|{bash_esc})\]
+        (?P<osc_params>[^\x07\x1b]*?)
+        (?P<osc_code>\x07|\x1b\\|\\e\\|\\a)
+    )
+    | (?P<start>\\\[)
+    | (?P<end>\\\])
+    | (?P<esc>(?:{esc}|{bash_esc})[\ -~]?)
+    '''.format(
+        esc=re.escape(ESC),
+        bash_esc=re.escape(BASH_ESC)
+    ),
+    re.VERBOSE | re.DOTALL
+)
+
+
+def parse_params(params):
+    if not params:
+        return ()
+
+    return tuple(
+        int(param) if param.isdigit() else param
+        for param in params.split(';')
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def char_width(char):
+    if unicodedata.combining(char):
+        return 0
+
+    elif unicodedata.category(char) in ('Cc', 'Cf', 'Me', 'Mn'):
+        return 0
+
+    elif unicodedata.east_asian_width(char) in ('F', 'W'):
+        return 2
+
+    else:
+        return 1
+
+
+def text_width(text):
+    if text.isascii() and text.isprintable():
+        return len(text)
+
+    others = NON_PRINTABLE_ASCII.findall(text)
+
+    return len(text) - len(others) + sum(char_width(char) for char in others)
+
+
+@functools.lru_cache(maxsize=4096)
+def make_token(kind, raw):
+    if kind == 'csi':
+        match = TOKEN.fullmatch(raw)
+
+        return AnsiSequence(
+            *parse_params(match.group('csi_params')),
+            code=match.group('csi_code')
         )
 
-        self.register_attr(
-            'Invisible',
-            lambda: lambda: AnsiSequence(8, code='m'),
-            """
-            Set Invisible.
-            """
+    elif kind == 'osc':
+        match = TOKEN.fullmatch(raw)
+
+        return OscSequence(
+            *parse_params(match.group('osc_params')),
+            code=match.group('osc_code')
         )
 
-        self.register_attr(
-            'UnItalic',
-            lambda: lambda: AnsiSequence(23, code='m'),
-            """
-            Unset Italic or Inverse.
+    elif kind == 'start':
+        return Marker.Start
 
-            .. warning::
+    elif kind == 'end':
+        return Marker.End
 
-                This is unreliable. It is better to use
-                :py:attr:`Sequence.Reset`
-            """
-        )
+    else:
+        return RawEscape(raw)
 
-        self.register_attr(
-            'UnUnderline',
-            lambda: lambda: AnsiSequence(24, code='m'),
-            """
-            Unset Underline or Back.
 
-            .. warning::
+def tokenize(text):
+    pos = 0
 
-                This is unreliable. It is better to use
-                :py:attr:`Sequence.Reset`
-            """
-        )
+    for match in TOKEN.finditer(text):
+        start, end = match.span()
 
-        self.register_attr(
-            'UnBlink',
-            lambda: lambda: AnsiSequence(25, code='m'),
-            """
-            Unset Blink or Underline.
+        if start > pos:
+            yield text[pos:start]
 
-            .. warning::
+        pos = end
+        yield make_token(match.lastgroup, match.group())
 
-                This is unreliable. It is better to use
-                :py:attr:`Sequence.Reset`
-            """
-        )
+    if pos < len(text):
+        yield text[pos:]
 
-        self.register_attr(
-            'UnInverse',
-            lambda: lambda: AnsiSequence(27, code='m'),
-            """
-            Unset Inverse.
 
-            .. warning::
+def strip_ansi(text):
+    return HIDDEN.sub('', text)
+
+
+def visible_width(text):
+    return text_width(strip_ansi(text))
+
+
+NON_PRINTABLE_ASCII = re.compile(r'[^\x20-\x7e]')
+HIDDEN = re.compile(
+    r'''
+    (?:{esc}|{bash_esc})
+    (?:
+        \[[0-?]*[\ -/]*[@-~]
+        | \][^\x07\x1b]*?(?:\x07|\x1b\\|\\e\\|\\a)
+        | [\ -~]?
+    )
+    | \\\[.*?\\\]
+    | \\\]
+    '''.format(
+        esc=re.escape(ESC),
+        bash_esc=re.escape(BASH_ESC)
+    ),
+    re.VERBOSE | re.DOTALL
+)
+
+
+SequenceSpec = collections.namedtuple(
+    'SequenceSpec',
+    'name code arity validator doc constructor'
+)
+
+
+def sequence(name, code, validator, doc, cls=None):
+    if cls is None:
+        cls = AnsiSequence
+
+    signature = inspect.signature(validator)
+    params = signature.parameters.values()
+    arity = (
+        sum(1 for param in params if param.default is param.empty),
+        len(params),
+    )
+
+    def constructor(*args, **kwargs):
+        return cls(*validator(*args, **kwargs), code=code)
+
+    constructor.__name__ = constructor.__qualname__ = name
+    constructor.__doc__ = doc
+    constructor.__signature__ = signature
 
-                This is unreliable. It is better to use
-                :py:attr:`Sequence.Reset`
-            """
+    return SequenceSpec(name, code, arity, validator, doc, constructor)
+
+
+def fixed(*params):
+    return lambda: params
+
+
+def erase_code(ec=EraseCode.End):
+    if isinstance(ec, EraseCode):
+        return (ec.value,)
+
+    elif ec in range(3):
+        return (ec,)
+
+    raise ValueError(
+        ' '.join([
+            'ec must be an EraseCode or an integer in the',
+            'range 0-2, and not {ec!r}.'
+        ]).format(
+            ec=ec
         )
+    )
 
-        self.register_attr(
-            'UnInvisible',
-            lambda: lambda: AnsiSequence(28, code='m'),
-            """
-            Unset Invisible.
 
-            .. warning::
+def scroll_region(a=None, b=None):
+    if a is not None and b is not None:
+        return (a, b)
+
+    return ()
+
+
+TITLE_CONTROL = re.compile('[\x00-\x1f\x7f-\x9f]')
+
+
+def title_text(txt):
+    return (
+        0,
+        TITLE_CONTROL.sub(
+            lambda match: '\\x{:02x}'.format(ord(match.group())),
+            txt
+        ),
+    )
+
+
+def ansi_color(base):
+    def validator(color):
+        if hasattr(color, 'ansi'):
+            return (1 if color.ansi.shift else 2, base + color.ansi.index)
+
+        elif color in range(8, 16):
+            return (1, base + colors.from_ansi(color - 8, True).ansi.index)
+
+        else:
+            return (2, base + colors.from_ansi(color, False).ansi.index)
+
+    return validator
 
-                This is unreliable. It is better to use
-                :py:attr:`Sequence.Reset`
-            """
+
+def color24(base):
+    def validator(r, g=None, b=None):
+        if hasattr(r, 'rgb'):
+            rgb = r.rgb
+
+        elif hasattr(r, 'red') and hasattr(r, 'green') and hasattr(r, 'blue'):
+            rgb = r
+
+        elif r in range(256) and g in range(256) and b in range(256):
+            rgb = colors.from_rgb(r, g, b)
+
+        else:
+            raise ValueError(
+                ' '.join([
+                    'r must be a prompter.colors color or r, g,',
+                    'and b must be integers in the range'
+                    '(0-255), not {r!r}, {g!r}, {b!r}'
+                ]).format(
+                    r=r,
+                    g=g,
+                    b=b
+                )
+            )
+
+        return (base, 2) + tuple(rgb)
+
+    return validator
+
+
+def xterm_color(base):
+    def validator(color):
+        if hasattr(color, 'xterm'):
+            return (base, 5, color.xterm.index)
+
+        return (base, 5, colors.from_xterm(color).xterm.index)
+
+    return validator
+
+
+SEQUENCES = (
+    sequence(
+        'CursorUp',
+        'A',
+        lambda lines=1: (lines,),
+        """
+        Moves cursor up by *lines* lines (1 by default).
+
+        :param lines: Number of lines to move the cursor up
+        :type lines: integer
+        """,
+    ),
+    sequence(
+        'CursorDown',
+        'B',
+        lambda lines=1: (lines,),
+        """
+        Moves cursor down by *lines* lines (1 by default).
+
+        :param lines: Number of lines to move the cursor down
+        :type lines: integer
+        """,
+    ),
+    sequence(
+        'CursorRight',
+        'C',
+        lambda rows=1: (rows,),
+        """
+        Moves cursor right by *rows* rows (1 by default).
+
+        :param rows: Number of rows to move the cursor right
+        :type rows: integer
+        """,
+    ),
+    sequence(
+        'CursorLeft',
+        'D',
+        lambda rows=1: (rows,),
+        """
+        Moves cursor left by *rows* rows (1 by default).
+
+        :param rows: Number of rows to move the cursor left
+        :type rows: integer
+        """,
+    ),
+    sequence(
+        'CursorDownHome',
+        'E',
+        lambda lines=1: (lines,),
+        """
+        Moves cursor to beginning of the line *lines* (1 by default) lines
+        down.
+
+        :param lines: Number of lines to move the cursor down
+        :type lines: integer
+        """,
+    ),
+    sequence(
+        'CursorUpHome',
+        'F',
+        lambda lines=1: (lines,),
+        """
+        Moves cursor to beginning of the line *lines* (1 by default) lines
+        up.
+
+        :param lines: Number of lines to move the cursor up
+        :type lines: integer
+        """,
+    ),
+    sequence(
+        'ColSet',
+        'G',
+        lambda col: (col,),
+        """
+        Moves the cursor to column *col* (absolute, 1-based).
+
+        :param col: The column to move the cursor to.
+        :type col: integer
+        """,
+    ),
+    sequence(
+        'PosSet',
+        'H',
+        lambda row, col: (row, col),
+        """
+        Set cursor position. The values *row* and *col* are 1-based.
+
+        :param row: The row to move the cursor to.
+        :type row: integer
+        :param col: The column to move the cursor to.
+        :type col: integer
+        """,
+    ),
+    sequence(
+        'EraseScreen',
+        'J',
+        erase_code,
+        """
+        Erase display.
+
+        * When *ec* is :py:attr:`EraseCode.End` or missing: from cursor toi
+            end of display.
+        * When *ec* is :py:attr:`EraseCode.Start`: erase from start to
+            cursor.
+        * When *ec* is :py:attr:`EraseCode.All`: erase whole display and
+            moves cursor to upper-left corner.
+
+        :param ec: The code that determines how the display erasing will
+            work.
+        :type ec: :py:class:`EraseCode`
+        """,
+    ),
+    sequence(
+        'EraseLine',
+        'K',
+        erase_code,
+        """
+        Erase line.
+
+        * When *ec* is :py:attr:`EraseCode.End` or missing: from cursor to
+            end of line.
+        * When *ec* is :py:attr:`EraseCode.Start`: erase from start of line
+            to cursor.
+        * When *ec* is :py:attr:`EraseCode.All`: erase whole line and moves
+            cursor to first column.
+
+        :param ec: The code that determines how the line erasing will work.
+        :type ec: :py:class:`EraseCode`
+        """,
+    ),
+    sequence(
+        'InsertLine',
+        'L',
+        lambda n=1: (n,),
+        """
+        Insert *n* (default 1) lines before current, scroll part of screen
+        from current line to bottom.
+
+        :param n: Number of lines to insert
+        :type n: integer
+        """,
+    ),
+    sequence(
+        'DeleteLine',
+        'M',
+        lambda n=1: (n,),
+        """
+        Delete *n* (default 1) lines including current.
+
+        :param n: Number of lines to delete
+        :type n: integer
+        """,
+    ),
+    sequence(
+        'ScrollUp',
+        'S',
+        lambda lines: (lines,),
+        """
+        Scroll screen (whole buffer) up by *lines*. New lines are added at
+        the bottom.
+
+        :param lines: Number of lines to scroll the screen up by.
+        :type lines: integer
+        """,
+    ),
+    sequence(
+        'ScrollDown',
+        'T',
+        lambda lines: (lines,),
+        """
+        Scroll screen (whole buffer) down by *lines*. New lines are added
+        at the top.
+
+        :param lines: Number of lines to scroll the screen down by.
+        :type lines: integer
+        """,
+    ),
+    sequence(
+        'EraseChar',
+        'X',
+        lambda n=1: (n,),
+        """
+        Erase *n* (default 1) characters from cursor (fill with spaces and
+        default attributes).
+
+        :param n: Number of characters to delete
+        :type n: integer
+        """,
+    ),
+    sequence(
+        'ScrollSet',
+        'r',
+        scroll_region,
+        """
+        Set scrolling region from top=*a* to bottom=*b*. The values *a* and
+        *b* are 1-based. *Omit values to reset region.*
+
+        :param a: The top row position for the scrolling region (absolute
+            value)
+        :type a: integer
+        :param b: The bottom row position for the scrolling region
+            (absolute value)
+        :type b: integer
+        """,
+    ),
+    sequence(
+        'PosSave',
+        's',
+        fixed(),
+        """
+        Save vursor position (cannot be nested).
+        """,
+    ),
+    sequence(
+        'PosRestore',
+        'u',
+        fixed(),
+        """
+        Restore cursor position.
+        """,
+    ),
+    sequence(
+        'GetGTC',
+        '>c',
+        fixed(),
+        """
+        Report "ESC > 67 ; build ; 0 c"
+        """,
+    ),
+    sequence(
+        'GetC',
+        'c',
+        fixed(),
+        """
+        Report "ESC [ ? 1 ; 2 c"
+        """,
+    ),
+    sequence(
+        'GetStatus',
+        'n',
+        fixed(5),
+        """
+        Report status as "CSI 0 n" (OK)
+        """,
+    ),
+    sequence(
+        'GetPos',
+        'n',
+        fixed(6),
+        """
+        Report Cursor Position as "ESC [ row ; col R"
+        """,
+    ),
+    sequence(
+        'GetTextArea',
+        't',
+        fixed(18),
+        """
+        Report the size of the text area in characters as
+        "ESC [ 8 ; height ; width t"
+        """,
+    ),
+    sequence(
+        'GetScreen',
+        't',
+        fixed(19),
+        """
+        Report the size of the screen in characters as
+        "ESC [ 9 ; height ; width t"
+        """,
+    ),
+    sequence(
+        'GetTitle',
+        't',
+        fixed(21),
+        """
+        Report window's title as "ESC ] l title ESC \\"
+        """,
+    ),
+    sequence(
+        'LineWrapOn',
+        'h',
+        lambda col=80: (7, col),
+        """
+        Enable lines wrapping at column position. If *col* (1-based) is
+        absent, wrap at column 80.
+
+        :param col: The column to wrap lines at.
+        :type col: integer
+        """,
+    ),
+    sequence(
+        'LineWrapOff',
+        'l',
+        fixed(7),
+        """
+        Disables line wrapping. Lines wrap at the end of screen buffer.
+        """,
+    ),
+    sequence(
+        'CursorShow',
+        'h',
+        fixed(25),
+        """
+        Show text cursor.
+        """,
+    ),
+    sequence(
+        'CursorHide',
+        'l',
+        fixed(25),
+        """
+        Hide text cursor.
+        """,
+    ),
+    sequence(
+        'SetTitle',
+        ST,
+        title_text,
+        """
+        Set console window title to *txt*.
+
+        :param txt: The text to change the console window's title to.
+        :type txt: string
+        """,
+        cls=OscSequence,
+    ),
+    sequence(
+        'Reset',
+        'm',
+        fixed(0),
+        """
+        Reset current attributes.
+        """,
+    ),
+    sequence(
+        'Bold',
+        'm',
+        fixed(1),
+        """
+        Set Bright or Bold.
+        """,
+    ),
+    sequence(
+        'UnBold',
+        'm',
+        fixed(2),
+        """
+        Unset Bright or Bold.
+
+        .. warning::
+
+            This is unreliable. It is better to use
+            :py:attr:`Sequence.Reset`
+        """,
+    ),
+    sequence(
+        'Italic',
+        'm',
+        fixed(3),
+        """
+        Set Italic or Inverse.
+        """,
+    ),
+    sequence(
+        'Underline',
+        'm',
+        fixed(4),
+        """
+        Set Underline or Back.
+        """,
+    ),
+    sequence(
+        'Blink',
+        'm',
+        fixed(5),
+        """
+        Set Blink or Underline.
+        """,
+    ),
+    sequence(
+        'Inverse',
+        'm',
+        fixed(7),
+        """
+        Set Inverse.
+        """,
+    ),
+    sequence(
+        'Invisible',
+        'm',
+        fixed(8),
+        """
+        Set Invisible.
+        """,
+    ),
+    sequence(
+        'UnItalic',
+        'm',
+        fixed(23),
+        """
+        Unset Italic or Inverse.
+
+        .. warning::
+
+            This is unreliable. It is better to use
+            :py:attr:`Sequence.Reset`
+        """,
+    ),
+    sequence(
+        'UnUnderline',
+        'm',
+        fixed(24),
+        """
+        Unset Underline or Back.
+
+        .. warning::
+
+            This is unreliable. It is better to use
+            :py:attr:`Sequence.Reset`
+        """,
+    ),
+    sequence(
+        'UnBlink',
+        'm',
+        fixed(25),
+        """
+        Unset Blink or Underline.
+
+        .. warning::
+
+            This is unreliable. It is better to use
+            :py:attr:`Sequence.Reset`
+        """,
+    ),
+    sequence(
+        'UnInverse',
+        'm',
+        fixed(27),
+        """
+        Unset Inverse.
+
+        .. warning::
+
+            This is unreliable. It is better to use
+            :py:attr:`Sequence.Reset`
+        """,
+    ),
+    sequence(
+        'UnInvisible',
+        'm',
+        fixed(28),
+        """
+        Unset Invisible.
+
+        .. warning::
+
+            This is unreliable. It is better to use
+            :py:attr:`Sequence.Reset`
+        """,
+    ),
+    sequence(
+        'AnsiColorText',
+        'm',
+        ansi_color(30),
+        """
+        Set ANSI text color.
+
+        :param color: The color to set the text (foreground) to.
+        :type color: integer
+        """,
+    ),
+    sequence(
+        'AnsiColorBack',
+        'm',
+        ansi_color(40),
+        """
+        Set ANSI background color.
+
+        :param color: The color to set the background to.
+        :type color: integer
+        """,
+    ),
+    sequence(
+        'ResetColorText',
+        'm',
+        fixed(39),
+        """
+        Resets the text (foreground) color.
+        """,
+    ),
+    sequence(
+        'ResetColorBack',
+        'm',
+        fixed(49),
+        """
+        Resets the background color.
+        """,
+    ),
+    sequence(
+        'Color24Text',
+        'm',
+        color24(38),
+        """
+        Set xterm 24-bit text (foreground) color. This can either be
+        through setting individual r, g, b integer values, or can be
+        through using a :py:mod:`prompter.colors` color.
+
+        :param r: Either the :py:mod:`prompter.colors` color, or the
+            integer value for the red component.
+        :param g: Either the integer value for the green component or not
+            needed (if r is a :py:mod:`prompter.colors` color)
+        :param b: Either the integer value for the blue component or not
+            needed (if r is a :py:mod:`prompter.colors` color)
+        """,
+    ),
+    sequence(
+        'Color24Back',
+        'm',
+        color24(48),
+        """
+        Set xterm 24-bit background color. This can either be through
+        setting individual r, g, b integer values, or can be through using
+        a :py:mod:`prompter.colors` color.
+
+        :param r: Either the :py:mod:`prompter.colors` color, or the
+            integer value for the red component.
+        :param g: Either the integer value for the green component or not
+            needed (if r is a :py:mod:`prompter.colors` color)
+        :param b: Either the integer value for the blue component or not
+            needed (if r is a :py:mod:`prompter.colors` color)
+        """,
+    ),
+    sequence(
+        'ColorText',
+        'm',
+        xterm_color(38),
+        """
+        Set xterm text (foreground) color. *color* is color index from 0 to
+        255 or a :py:mod:`prompter.colors` color.
+
+        :param color: Either a :py:mod:`prompter.colors` color or the 0-255
+            color index.
+        """,
+    ),
+    sequence(
+        'ColorBack',
+        'm',
+        xterm_color(48),
+        """
+        Set xterm background color. *color* is color index from 0 to 255 or
+        a :py:mod:`prompter.colors` color.
+
+        :param color: Either a :py:mod:`prompter.colors` color or the 0-255
+            color index.
+        """,
+    ),
+)
+
+
+class SequenceConfig(config.Base):
+    catalog = collections.OrderedDict(
+        (spec.name, spec)
+        for spec in SEQUENCES
+    )
+
+    static_attrs = {
+        name: spec.constructor
+        for name, spec in catalog.items()
+    }
+
+    def __init__(self):
+        self.bad_names |= {
+            'catalog',
+        }
+
+
+class AnsiConfig(config.Base):
+    def __init__(self):
+        self.register_attr(
+            'seq',
+            lambda: SequenceConfig(),
+            SequenceConfig.__doc__
         )
 
         self.register_attr(
-            'AnsiColorText',
-            lambda: lambda color: AnsiSequence(
-                *(
-                    [1 if color.ansi.shift else 2, 30 + color.ansi.index]
-                    if hasattr(color, 'ansi')
-                    else [1, 30 + colors.from_ansi(color - 8, True).ansi.index]
-                    if color in range(8, 16)
-                    else [2, 30 + colors.from_ansi(color, False).ansi.index]
-                ),
-                code='m'
-            ),
-            """
-            Set ANSI text color.
-
-            :param color: The color to set the text (foreground) to.
-            :type color: integer
-            """
+            'code',
+            lambda: config.to_config({
+                'erase': {
+                    code.name: code
+                    for code in EraseCode
+                },
+                'CSI': AnsiSequence.CSI,
+                'BASH_ESC': BASH_ESC,
+            }),
+            'Contains codes used by the ansi module.'
         )
 
         self.register_attr(
-            'AnsiColorBack',
-            lambda: lambda color: AnsiSequence(
-                *(
-                    [1 if color.ansi.shift else 2, 40 + color.ansi.index]
-                    if hasattr(color, 'ansi')
-                    else [1, 40 + colors.from_ansi(color - 8, True).ansi.index]
-                    if color in range(8, 16)
-                    else [2, 40 + colors.from_ansi(color, False).ansi.index]
-                ),
-                code='m'
-            ),
-            """
-            Set ANSI background color.
-
-            :param color: The color to set the background to.
-            :type color: integer
-            """
+            'SgrState',
+            lambda: SgrState,
+            'Immutable model of the terminal SGR attribute state.'
         )
 
         self.register_attr(
-            'ResetColorText',
-            lambda: lambda: AnsiSequence(39, code='m'),
-            """
-            Resets the text (foreground) color.
-            """
+            'to_bash',
+            lambda: to_bash,
+            'Renders a sequence with the bash prompt escape instead of ESC.'
         )
 
         self.register_attr(
-            'ResetColorBack',
-            lambda: lambda: AnsiSequence(49, code='m'),
-            """
-            Resets the background color.
-            """
+            'get_sink',
+            lambda: get_sink,
+            ' '.join([
+                'Wraps a stream, bytearray or memoryview as a ByteSink for',
+                'the emit_into methods.'
+            ])
         )
 
         self.register_attr(
-            'Color24Text',
-            lambda: lambda r, g=None, b=None: AnsiSequence(
-                38,
-                2,
-                *(
-                    r.rgb
-                    if (hasattr(r, 'rgb'))
-                    else r
-                    if (
-                        hasattr(r, 'red')
-                        and hasattr(r, 'green')
-                        and hasattr(r, 'blue')
-                    )
-                    else colors.from_rgb(r, g, b)
-                    if (
-                        r in range(256)
-                        and g in range(256)
-                        and b in range(256)
-                    )
-                    else raise_(
-                        ValueError(
-                            ' '.join([
-                                'r must be a prompter.colors color or r, g,',
-                                'and b must be integers in the range'
-                                '(0-255), not {r!r}, {g!r}, {b!r}'
-                            ]).format(
-                                r=r,
-                                g=g,
-                                b=b
-                            )
-                        )
-                    )
-                ),
-                code='m'
-            ),
-            """
-            Set xterm 24-bit text (foreground) color. This can either be
-            through setting individual r, g, b integer values, or can be
-            through using a :py:mod:`prompter.colors` color.
-
-            :param r: Either the :py:mod:`prompter.colors` color, or the
-                integer value for the red component.
-            :param g: Either the integer value for the green component or not
-                needed (if r is a :py:mod:`prompter.colors` color)
-            :param b: Either the integer value for the blue component or not
-                needed (if r is a :py:mod:`prompter.colors` color)
-            """
+            'tokenize',
+            lambda: tokenize,
+            ' '.join([
+                'Splits rendered text into text runs, AnsiSequence and',
+                'OscSequence objects, bash non-printing Markers and',
+                'RawEscape strings in a single pass.'
+            ])
         )
 
         self.register_attr(
-            'Color24Back',
-            lambda: lambda r, g=None, b=None: AnsiSequence(
-                48,
-                2,
-                *(
-                    r.rgb
-                    if hasattr(r, 'rgb')
-                    else r
-                    if (
-                        hasattr(r, 'red')
-                        and hasattr(r, 'green')
-                        and hasattr(r, 'blue')
-                    )
-                    else colors.from_rgb(r, g, b)
-                    if (
-                        r in range(256)
-                        and g in range(256)
-                        and b in range(256)
-                    )
-                    else raise_(
-                        ValueError(
-                            ' '.join([
-                                'r must be a prompter.colors color or r, g,',
-                                'and b must be integers in the range'
-                                '(0-255), not {r!r}, {g!r}, {b!r}'
-                            ]).format(
-                                r=r,
-                                g=g,
-                                b=b
-                            )
-                        )
-                    )
-                ),
-                code='m'
-            ),
-            """
-            Set xterm 24-bit background color. This can either be through
-            setting individual r, g, b integer values, or can be through using
-            a :py:mod:`prompter.colors` color.
-
-            :param r: Either the :py:mod:`prompter.colors` color, or the
-                integer value for the red component.
-            :param g: Either the integer value for the green component or not
-                needed (if r is a :py:mod:`prompter.colors` color)
-            :param b: Either the integer value for the blue component or not
-                needed (if r is a :py:mod:`prompter.colors` color)
-            """
+            'visible_width',
+            lambda: visible_width,
+            ' '.join([
+                'Returns the terminal cell width of rendered text, ignoring',
+                'escape sequences and anything inside bash \\[ \\] markers.'
+            ])
         )
 
         self.register_attr(
-            'ColorText',
-            lambda: lambda color: AnsiSequence(
-                38,
-                5,
-                color.xterm.index
-                if hasattr(color, 'xterm')
-                else colors.from_xterm(color).xtermi.index,
-                code='m'
-            ),
-            """
-            Set xterm text (foreground) color. *color* is color index from 0 to
-            255 or a :py:mod:`prompter.colors` color.
-
-            :param color: Either a :py:mod:`prompter.colors` color or the 0-255
-                color index.
-            """
+            'strip',
+            lambda: strip_ansi,
+            ' '.join([
+                'Returns rendered text with every escape and non-printing run',
+                'removed.'
+            ])
         )
 
         self.register_attr(
-            'ColorBack',
-            lambda: lambda color: AnsiSequence(
-                48,
-                5,
-                color.xterm.index
-                if hasattr(color, 'xterm')
-                else colors.from_xterm(color).xterm.index,
-                code='m'
-            ),
-            """
-            Set xterm background color. *color* is color index from 0 to 255 or
-            a :py:mod:`prompter.colors` color.
-
-            :param color: Either a :py:mod:`prompter.colors` color or the 0-255
-                color index.
-            """
+            'Transcoder',
+            lambda: _transcode.Transcoder,
+            ' '.join([
+                'Incremental SGR color-depth converter; feed() it chunks of',
+                'bytes and finish() it at end of stream.'
+            ])
         )
 
+        self.register_attr(
+            'transcode',
+            lambda: _transcode.transcode,
+            ' '.join([
+                'Streams a binary input to a binary output, re-targeting',
+                'every 24-bit and 256-color SGR code to the given depth.'
+            ])
+        )
 
-class AnsiConfig(config.Base):
-    def __init__(self):
         self.register_attr(
-            'seq',
-            lambda: SequenceConfig(),
-            SequenceConfig.__doc__
+            'transcode_bytes',
+            lambda: _transcode.transcode_bytes,
+            'Re-targets the SGR colors in a bytes value to the given depth.'
         )
 
         self.register_attr(
-            'code',
-            lambda: config.to_config({
-                'erase': {
-                    code.name: code
-                    for code in EraseCode
-                },
-                'CSI': AnsiSequence.CSI,
-            }),
-            'Contains codes used by the ansi module.'
+            'optimize_sgr',
+            lambda: optimize_sgr,
+            optimize_sgr.__doc__
         )
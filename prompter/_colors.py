@@ -1,9 +1,103 @@
+import array
 import collections
 import colorsys
 import functools
+import hashlib
+import heapq
+import operator
+import re
+import threading
 
+import pkg_resources
+
+from prompter import _oklab
 from prompter import config
 
+SEP = '/'
+config_resource = 'prompter._config'
+
+
+class ConversionGraph:
+    def __init__(self):
+        self.nodes = {}
+        self.types = {}
+        self.edges = collections.defaultdict(dict)
+        self.paths = {}
+
+    def add_node(self, short_name, cls):
+        self.nodes[short_name] = cls
+        self.types[cls] = short_name
+
+    def register(self, src, dst, func, cost=1):
+        self.edges[src][dst] = (cost, func)
+        self.paths.clear()
+
+    def edge(self, src, dst, cost=1):
+        def edge_decorator(func):
+            self.register(src, dst, func, cost)
+            return func
+
+        return edge_decorator
+
+    def knows(self, color):
+        return type(color) in self.types
+
+    def path(self, src, dst):
+        key = (src, dst)
+
+        if key not in self.paths:
+            costs = {src: 0}
+            queue = [(0, src, ())]
+            found = None
+
+            while queue:
+                cost, node, steps = heapq.heappop(queue)
+
+                if node == dst:
+                    found = steps
+                    break
+
+                if cost > costs[node]:
+                    continue
+
+                for next_node, (edge_cost, func) in self.edges[node].items():
+                    next_cost = cost + edge_cost
+                    if next_cost < costs.get(next_node, next_cost + 1):
+                        costs[next_node] = next_cost
+                        heapq.heappush(
+                            queue,
+                            (next_cost, next_node, steps + (func, ))
+                        )
+
+            if found is None:
+                raise ValueError(
+                    'No conversion from {src} to {dst}'.format(
+                        src=src,
+                        dst=dst
+                    )
+                )
+
+            self.paths[key] = found
+
+        return self.paths[key]
+
+    def convert(self, color, dst):
+        try:
+            src = self.types[type(color)]
+
+        except KeyError:
+            raise ValueError(
+                'Unknown color type: {cls!r}'.format(cls=type(color))
+            ) from None
+
+        for func in self.path(src, dst):
+            color = func(color)
+
+        return color
+
+
+conversions = ConversionGraph()
+
 
 class ColorDecorator:
     props = {
@@ -16,6 +110,7 @@ class ColorDecorator:
         'cube6',
         'cube5',
         'cube6_xterm',
+        'packed',
     }
 
     grads = {
@@ -25,23 +120,50 @@ class ColorDecorator:
         'grayscale',
     }
 
+    intern_size = 4096
+    interned = collections.OrderedDict()
+    intern_lock = threading.Lock()
+
     def __init__(self, short_name, base_prop=None):
         self.short_name = short_name
         self.base_prop = base_prop
 
     @staticmethod
-    def prop_meth(name, base_prop, self):
-        cls = type(self)
-        if not hasattr(
-            self, '_{name}__{prop}'.format(name=cls.__name__, prop=name)
-        ):
-            setattr(
-                self,
-                ''.join(['__', name]),
-                getattr(getattr(self, base_prop), name)
-            )
+    def prop_meth(name, self):
+        attr_name = '_{name}__{prop}'.format(
+            name=type(self).__name__,
+            prop=name
+        )
 
-        return getattr(self, ''.join(['__', name]))
+        if not hasattr(self, attr_name):
+            setattr(self, attr_name, conversions.convert(self, name))
+
+        return getattr(self, attr_name)
+
+    @staticmethod
+    def intern_new(new, cls, *args, **kwargs):
+        table = ColorDecorator.interned
+        key = (cls, args)
+
+        with ColorDecorator.intern_lock:
+            if not kwargs and key in table:
+                table.move_to_end(key)
+                return table[key]
+
+        color = new(cls, *args, **kwargs)
+        value_key = (cls, tuple(color))
+
+        with ColorDecorator.intern_lock:
+            color = table.setdefault(value_key, color)
+            table.move_to_end(value_key)
+
+            if not kwargs:
+                table[key] = color
+
+            while len(table) > ColorDecorator.intern_size:
+                table.popitem(last=False)
+
+        return color
 
     @staticmethod
     def gen_gradient(self, short_name, color_type, other):
@@ -90,7 +212,20 @@ class ColorDecorator:
         return cmp_meth(other)
 
     def __call__(self, cls):
+        conversions.add_node(self.short_name, cls)
+
         if self.base_prop is not None:
+            conversions.register(
+                self.short_name,
+                self.base_prop,
+                operator.attrgetter(self.base_prop)
+            )
+            conversions.register(
+                self.base_prop,
+                self.short_name,
+                getattr(cls, '_'.join(['from', self.base_prop]))
+            )
+
             my_props = {
                 prop
                 for prop in ColorDecorator.props
@@ -104,11 +239,7 @@ class ColorDecorator:
                     cls,
                     prop,
                     property(
-                        functools.partial(
-                            ColorDecorator.prop_meth,
-                            prop,
-                            self.base_prop
-                        )
+                        functools.partial(ColorDecorator.prop_meth, prop)
                     )
                 )
 
@@ -131,6 +262,11 @@ class ColorDecorator:
             )
 
         setattr(cls, '__hash__', super(cls, cls).__hash__)
+        setattr(
+            cls,
+            '__new__',
+            functools.partial(ColorDecorator.intern_new, cls.__new__)
+        )
 
         for cmp_type in ('gt', 'ge', 'lt', 'le', 'eq', 'ne'):
             attr_name = ''.join(['__', cmp_type, '__'])
@@ -206,6 +342,13 @@ class RGBColor(collections.namedtuple('RGBColor', 'red green blue')):
 
         return self.__cube6_xterm
 
+    @property
+    def packed(self):
+        if not hasattr(self, '_RGBColor__packed'):
+            self.__packed = PackedColor.from_rgb(self)
+
+        return self.__packed
+
     @classmethod
     def from_hsv(cls, hsv):
         red, green, blue = colorsys.hsv_to_rgb(
@@ -235,26 +378,14 @@ class RGBColor(collections.namedtuple('RGBColor', 'red green blue')):
         )
 
     def gen_rgb_gradient(self, other):
-        if isinstance(
-            other,
-            (
-                HSVColor,
-                HSLColor,
-                Cube6Color,
-                Cube5Color,
-                Cube6XtermColor,
-                AnsiColor,
-                XtermColor,
-                GrayscaleColor,
-            )
-        ):
-            other = other.rgb
+        if conversions.knows(other):
+            other = conversions.convert(other, 'rgb')
 
-        elif not isinstance(other, RGBColor):
+        else:
             raise ValueError(
                 ' '.join([
-                    'The given value must be a RGBColor, HSVColor,',
-                    'or HSLColor, not {other_type}'
+                    'The given value must be a known color type,',
+                    'not {other_type}'
                 ]).format(
                     other_type=type(other)
                 )
@@ -339,20 +470,8 @@ class HSVColor(collections.namedtuple('HSVColor', 'hue saturation value')):
         return -dist1 if dist1 < dist2 else dist2
 
     def gen_hsv_gradient(self, other):
-        if isinstance(
-            other,
-            (
-                HSLColor,
-                Cube6Color,
-                Cube5Color,
-                Cube6XtermColor,
-                RGBColor,
-                XtermColor,
-                AnsiColor,
-                GrayscaleColor,
-            )
-        ):
-            other = other.hsv
+        if conversions.knows(other):
+            other = conversions.convert(other, 'hsv')
 
         elif not isinstance(other, HSVColor) and other < 0:
             other = self.decr_hue(-1 * other)
@@ -437,20 +556,8 @@ class HSLColor(collections.namedtuple('HSLColor', 'hue saturation lightness')):
         return -dist1 if dist1 < dist2 else dist2
 
     def gen_hsl_gradient(self, other):
-        if isinstance(
-            other,
-            (
-                HSVColor,
-                Cube6Color,
-                Cube5Color,
-                Cube6XtermColor,
-                RGBColor,
-                XtermColor,
-                AnsiColor,
-                GrayscaleColor,
-            )
-        ):
-            other = other.hsl
+        if conversions.knows(other):
+            other = conversions.convert(other, 'hsl')
 
         elif not isinstance(other, HSLColor) and other < 0:
             other = self.decr_hue(-1 * other)
@@ -523,60 +630,9 @@ class AnsiColor(
 
     @classmethod
     def from_rgb(cls, rgb):
-        grays = {192}
-        colors1 = {0, 128}
-        colors2 = {0, 255}
+        index = PackedColor.from_rgb(rgb).to_ansi()
 
-        def get_ansi(rgb_val):
-            if rgb_val in cls._reftbl[:8]:
-                return cls._reftbl[:8].index(rgb_val), False
-
-            else:
-                return cls._reftbl[8:].index(rgb_val), True
-
-        good_values = sorted(list(grays | colors1 | colors2))
-
-        fixed = RGBColor(
-            min(good_values, key=lambda x: abs(x - rgb.red)),
-            min(good_values, key=lambda x: abs(x - rgb.green)),
-            min(good_values, key=lambda x: abs(x - rgb.blue)),
-        )
-
-        if (
-            any(color in grays for color in fixed)
-            and (
-                fixed.red != fixed.green or
-                fixed.red != fixed.blue or
-                fixed.green != fixed.blue
-            )
-        ):
-            good_values = sorted(list(colors1 | colors2))
-
-            fixed = RGBColor(
-                min(good_values, key=lambda x: abs(x - rgb.red)),
-                min(good_values, key=lambda x: abs(x - rgb.green)),
-                min(good_values, key=lambda x: abs(x - rgb.blue)),
-            )
-
-        exclusive1 = colors1 - colors2
-        exclusive2 = colors2 - colors1
-
-        if any(
-            color in fixed and any(
-                item in exclusive2
-                for item in fixed
-            )
-            for color in exclusive1
-        ):
-            good_values = sorted(list(colors2))
-
-            fixed = RGBColor(
-                min(good_values, key=lambda x: abs(x - rgb.red)),
-                min(good_values, key=lambda x: abs(x - rgb.green)),
-                min(good_values, key=lambda x: abs(x - rgb.blue)),
-            )
-
-        return cls(*get_ansi(fixed))
+        return cls(index % 8, index >= 8)
 
 
 class XtermMeta(type):
@@ -620,68 +676,7 @@ class XtermColor(
 
     @classmethod
     def from_rgb(cls, rgb):
-        ansi_grays = {192}
-        ansi_colors1 = {0, 128}
-        ansi_colors2 = {0, 255}
-        cube_colors = set(Cube6XtermColor.values)
-        grayscale = set(range(8, 239, 10))
-
-        good_values = sorted(list(
-            ansi_grays
-            | ansi_colors1
-            | ansi_colors2
-            | cube_colors
-            | grayscale
-        ))
-
-        fixed = RGBColor(
-            min(good_values, key=lambda x: abs(x - rgb.red)),
-            min(good_values, key=lambda x: abs(x - rgb.green)),
-            min(good_values, key=lambda x: abs(x - rgb.blue)),
-        )
-
-        grays = (
-            (ansi_grays | grayscale)
-            - (ansi_colors1 | ansi_colors2 | cube_colors)
-        )
-
-        if (
-            any(color in grays for color in fixed)
-            and (
-                fixed.red != fixed.green or
-                fixed.red != fixed.blue or
-                fixed.green != fixed.blue
-            )
-        ):
-            good_values = sorted(
-                list(ansi_colors1 | ansi_colors2 | cube_colors)
-            )
-
-            fixed = RGBColor(
-                min(good_values, key=lambda x: abs(x - rgb.red)),
-                min(good_values, key=lambda x: abs(x - rgb.green)),
-                min(good_values, key=lambda x: abs(x - rgb.blue)),
-            )
-
-        exclusive1 = ansi_colors1 - (ansi_colors2 | cube_colors)
-        exclusive2 = (ansi_colors2 | cube_colors) - ansi_colors1
-
-        if any(
-            color in fixed and any(
-                item in exclusive2
-                for item in fixed
-            )
-            for color in exclusive1
-        ):
-            good_values = sorted(list(ansi_colors2 | cube_colors))
-
-            fixed = RGBColor(
-                min(good_values, key=lambda x: abs(x - rgb.red)),
-                min(good_values, key=lambda x: abs(x - rgb.green)),
-                min(good_values, key=lambda x: abs(x - rgb.blue)),
-            )
-
-        return cls(cls._reftbl.index(fixed))
+        return cls(PackedColor.from_rgb(rgb).to_xterm())
 
 
 @ColorDecorator('grayscale', 'rgb')
@@ -720,20 +715,8 @@ class GrayscaleColor(collections.namedtuple('GrayscaleColor', 'index')):
         )
 
     def gen_grayscale_gradient(self, other):
-        if isinstance(
-            other,
-            (
-                HSVColor,
-                HSLColor,
-                Cube6Color,
-                Cube5Color,
-                Cube6XtermColor,
-                AnsiColor,
-                XtermColor,
-                RGBColor,
-            )
-        ):
-            other = other.grayscale
+        if conversions.knows(other):
+            other = conversions.convert(other, 'grayscale')
 
         elif not isinstance(other, GrayscaleColor):
             other = GrayscaleColor(other)
@@ -831,17 +814,702 @@ class Cube6XtermColor(metaclass=CubeMeta):
     pass
 
 
+class SnapKernel:
+    def __init__(
+        self,
+        reftbl,
+        grays,
+        colors1,
+        colors2,
+        extra_colors=frozenset(),
+        extra_grays=frozenset()
+    ):
+        colors = colors2 | extra_colors
+
+        self.first = SnapKernel.snap_table(
+            grays | colors1 | colors | extra_grays
+        )
+        self.second = SnapKernel.snap_table(colors1 | colors)
+        self.third = SnapKernel.snap_table(colors)
+        self.grays = frozenset((grays | extra_grays) - (colors1 | colors))
+        self.exclusive1 = frozenset(colors1 - colors)
+        self.exclusive2 = frozenset(colors - colors1)
+        self.index = {}
+
+        for ndx, rgb in enumerate(reftbl):
+            self.index.setdefault(
+                (rgb.red << 16) | (rgb.green << 8) | rgb.blue,
+                ndx
+            )
+
+    @staticmethod
+    def snap_table(values):
+        values = sorted(values)
+
+        return bytes(
+            min(values, key=lambda x: abs(x - channel))
+            for channel in range(256)
+        )
+
+    def __call__(self, packed):
+        red = packed >> 16
+        green = (packed >> 8) & 0xff
+        blue = packed & 0xff
+
+        table = self.first
+        fixed = (table[red], table[green], table[blue])
+
+        if (
+            not fixed[0] == fixed[1] == fixed[2]
+            and any(color in self.grays for color in fixed)
+        ):
+            table = self.second
+            fixed = (table[red], table[green], table[blue])
+
+        if (
+            any(color in self.exclusive1 for color in fixed)
+            and any(color in self.exclusive2 for color in fixed)
+        ):
+            table = self.third
+            fixed = (table[red], table[green], table[blue])
+
+        return self.index[(fixed[0] << 16) | (fixed[1] << 8) | fixed[2]]
+
+
+def get_match_mode():
+    settings = config.settings
+
+    if 'color_match' in settings:
+        return settings.color_match
+
+    return 'channel'
+
+
+@functools.lru_cache(maxsize=None)
+def color_state():
+    path = SEP.join(['config', 'colors'])
+    digest = hashlib.sha1(repr(get_match_mode()).encode('utf-8'))
+
+    for entry in sorted(pkg_resources.resource_listdir(config_resource, path)):
+        digest.update(pkg_resources.resource_string(
+            config_resource,
+            SEP.join([path, entry])
+        ))
+
+    return digest.hexdigest()
+
+
+class PackedMeta(type):
+    @property
+    def _ansi_kernel(self):
+        if not hasattr(self, '_PackedMeta__ansi_kernel'):
+            if get_match_mode() == 'oklab':
+                self.__ansi_kernel = _oklab.PaletteIndex(AnsiColor._reftbl)
+
+            else:
+                self.__ansi_kernel = SnapKernel(
+                    AnsiColor._reftbl,
+                    grays={192},
+                    colors1={0, 128},
+                    colors2={0, 255},
+                )
+
+        return self.__ansi_kernel
+
+    @property
+    def _xterm_kernel(self):
+        if not hasattr(self, '_PackedMeta__xterm_kernel'):
+            if get_match_mode() == 'oklab':
+                self.__xterm_kernel = _oklab.PaletteIndex(XtermColor._reftbl)
+
+            else:
+                self.__xterm_kernel = SnapKernel(
+                    XtermColor._reftbl,
+                    grays={192},
+                    colors1={0, 128},
+                    colors2={0, 255},
+                    extra_colors=frozenset(Cube6XtermColor.values),
+                    extra_grays=frozenset(range(8, 239, 10)),
+                )
+
+        return self.__xterm_kernel
+
+
+class PackedColor(int, metaclass=PackedMeta):
+    __slots__ = ()
+
+    def __new__(cls, value):
+        if value not in range(0x1000000):
+            raise ValueError(
+                ' '.join([
+                    'The packed value must be an integer between',
+                    '0x000000-0xffffff, not {value!r}'
+                ]).format(
+                    value=value
+                )
+            )
+
+        return super().__new__(cls, value)
+
+    def __repr__(self):
+        return 'PackedColor(0x{value:06x})'.format(value=self)
+
+    @property
+    def red(self):
+        return self >> 16
+
+    @property
+    def green(self):
+        return (self >> 8) & 0xff
+
+    @property
+    def blue(self):
+        return self & 0xff
+
+    @property
+    def rgb(self):
+        return RGBColor(self >> 16, (self >> 8) & 0xff, self & 0xff)
+
+    @property
+    def hsv(self):
+        return HSVColor(*unpack_triplet(rgb_to_hsv_kernel(self)))
+
+    @property
+    def hsl(self):
+        return HSLColor(*unpack_triplet(rgb_to_hsl_kernel(self)))
+
+    @property
+    def xterm(self):
+        return XtermColor(self.to_xterm())
+
+    @property
+    def ansi(self):
+        index = self.to_ansi()
+
+        return AnsiColor(index % 8, index >= 8)
+
+    @classmethod
+    def from_rgb(cls, rgb):
+        if not isinstance(rgb, RGBColor) and conversions.knows(rgb):
+            rgb = conversions.convert(rgb, 'rgb')
+
+        return cls(pack_triplet(int(rgb.red), int(rgb.green), int(rgb.blue)))
+
+    def to_xterm(self):
+        return type(self)._xterm_kernel(self)
+
+    def to_ansi(self):
+        return type(self)._ansi_kernel(self)
+
+    def to_hsv(self):
+        return rgb_to_hsv_kernel(self)
+
+    def to_hsl(self):
+        return rgb_to_hsl_kernel(self)
+
+    def gen_packed_gradient(self, other, space='hsv'):
+        start = conversions.convert(self, space)
+
+        return PackedColor.pack(
+            getattr(start, '_'.join(['gen', space, 'gradient']))(other)
+        )
+
+    @staticmethod
+    def pack(colors):
+        return array.array(
+            'I',
+            (
+                color if isinstance(color, PackedColor)
+                else PackedColor.from_rgb(color)
+                for color in colors
+            )
+        )
+
+    @staticmethod
+    def unpack(buffer):
+        return tuple(PackedColor(value) for value in buffer)
+
+
+def pack_triplet(first, second, third):
+    return (first << 16) | (second << 8) | third
+
+
+def unpack_triplet(packed):
+    return packed >> 16, (packed >> 8) & 0xff, packed & 0xff
+
+
+UNIT_TABLE = tuple(channel / 255 for channel in range(256))
+
+
+@functools.lru_cache(maxsize=4096)
+def rgb_to_hsv_kernel(packed):
+    hue, saturation, value = colorsys.rgb_to_hsv(
+        UNIT_TABLE[packed >> 16],
+        UNIT_TABLE[(packed >> 8) & 0xff],
+        UNIT_TABLE[packed & 0xff],
+    )
+
+    return pack_triplet(
+        int(hue * 360),
+        int(saturation * 100),
+        int(value * 100)
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def rgb_to_hsl_kernel(packed):
+    hue, lightness, saturation = colorsys.rgb_to_hls(
+        UNIT_TABLE[packed >> 16],
+        UNIT_TABLE[(packed >> 8) & 0xff],
+        UNIT_TABLE[packed & 0xff],
+    )
+
+    return pack_triplet(
+        int(hue * 360),
+        int(saturation * 100),
+        int(lightness * 100)
+    )
+
+
+conversions.add_node('packed', PackedColor)
+conversions.register('rgb', 'packed', PackedColor.from_rgb)
+conversions.register('packed', 'rgb', operator.attrgetter('rgb'))
+conversions.register('packed', 'xterm', operator.attrgetter('xterm'))
+conversions.register('packed', 'ansi', operator.attrgetter('ansi'))
+
+
+@conversions.edge('hsv', 'hsl')
+def hsv_to_hsl(hsv):
+    return HSLColor(*unpack_triplet(rgb_to_hsl_kernel(pack_triplet(*hsv.rgb))))
+
+
+@conversions.edge('hsl', 'hsv')
+def hsl_to_hsv(hsl):
+    return HSVColor(*unpack_triplet(rgb_to_hsv_kernel(pack_triplet(*hsl.rgb))))
+
+
+@functools.lru_cache(maxsize=None)
+def cube6_xterm_table():
+    # The nearest-match route, not the cube's own 16-231 slot: the first
+    # sixteen entries duplicate some of the corners, and the first match
+    # wins.
+    return tuple(
+        XtermColor.from_rgb(Cube6XtermColor(red, green, blue).rgb)
+        for red in range(6)
+        for green in range(6)
+        for blue in range(6)
+    )
+
+
+@conversions.edge('cube6_xterm', 'xterm')
+def cube6_xterm_to_xterm(cube):
+    return cube6_xterm_table()[36 * cube.red + 6 * cube.green + cube.blue]
+
+
+@conversions.edge('ansi', 'xterm')
+def ansi_to_xterm(ansi):
+    return XtermColor(ansi.index + 8 * int(ansi.shift))
+
+
+def interpolate(start, end, fraction, space='hsv'):
+    start = conversions.convert(start, space)
+    end = conversions.convert(end, space)
+
+    values = []
+    for field in start._fields:
+        low = getattr(start, field)
+        high = getattr(end, field)
+
+        if field == 'hue':
+            value = (low + start.dist_hue(high) * fraction) % 360
+            values.append(int(value + 0.5) % 360)
+
+        else:
+            values.append(int(low + (high - low) * fraction + 0.5))
+
+    return type(start)(*values)
+
+
+def sample_gradient(start, end, count, space='hsv', palette=None):
+    if count < 1:
+        raise ValueError(
+            'The sample count must be at least 1, not {count!r}'.format(
+                count=count
+            )
+        )
+
+    denom = max(count - 1, 1)
+
+    samples = tuple(
+        interpolate(start, end, step / denom, space)
+        for step in range(count)
+    )
+
+    if palette is not None:
+        samples = tuple(
+            conversions.convert(sample, palette)
+            for sample in samples
+        )
+
+    return samples
+
+
+class Colormap:
+    size = 256
+
+    def __init__(self, stops, space='hsv'):
+        if not stops:
+            raise ValueError('A colormap needs at least one stop.')
+
+        self.stops = tuple(sorted(
+            (pct, PackedColor.from_rgb(color))
+            for pct, color in (
+                stops.items() if hasattr(stops, 'items') else stops
+            )
+        ))
+        self.space = space
+        self.tables = {}
+
+    @classmethod
+    def get(cls, stops, space='hsv'):
+        return cls.cached(
+            tuple(sorted(
+                (pct, PackedColor.from_rgb(color))
+                for pct, color in (
+                    stops.items() if hasattr(stops, 'items') else stops
+                )
+            )),
+            space
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def cached(cls, stops, space):
+        return cls(stops, space)
+
+    def __hash__(self):
+        return hash((self.stops, self.space))
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Colormap)
+            and (self.stops, self.space) == (other.stops, other.space)
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Colormap({stops!r}, space={space!r})'.format(
+            stops=dict(self.stops),
+            space=self.space
+        )
+
+    def __call__(self, fraction, palette='rgb'):
+        ndx = int(fraction * (self.size - 1) + 0.5)
+
+        return self.table(palette)[min(max(ndx, 0), self.size - 1)]
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def samples(self):
+        if 'samples' not in self.tables:
+            self.tables['samples'] = tuple(
+                self.sample(ndx / (self.size - 1) * 100)
+                for ndx in range(self.size)
+            )
+
+        return self.tables['samples']
+
+    def sample(self, pct):
+        low_pct, low_color = self.stops[0]
+        high_pct, high_color = self.stops[-1]
+
+        if pct <= low_pct:
+            return conversions.convert(low_color, self.space)
+
+        if pct >= high_pct:
+            return conversions.convert(high_color, self.space)
+
+        for (low_pct, low_color), (high_pct, high_color) in zip(
+            self.stops[:-1],
+            self.stops[1:]
+        ):
+            if low_pct <= pct <= high_pct:
+                break
+
+        return interpolate(
+            low_color,
+            high_color,
+            (pct - low_pct) / (high_pct - low_pct),
+            self.space
+        )
+
+    def table(self, palette='rgb'):
+        if palette not in self.tables:
+            self.tables[palette] = tuple(
+                conversions.convert(sample, palette)
+                for sample in self.samples
+            )
+
+        return self.tables[palette]
+
+    def thresholds(self, palette='rgb'):
+        key = ('thresholds', palette)
+
+        if key not in self.tables:
+            self.tables[key] = tuple(self.gen_thresholds(palette))
+
+        return self.tables[key]
+
+    def gen_thresholds(self, palette):
+        table = self.table(palette)
+        stops = [
+            (pct / 100, conversions.convert(color, palette))
+            for pct, color in self.stops
+        ]
+        last = None
+
+        for ndx, (high, high_color) in enumerate(stops):
+            if ndx:
+                low = stops[ndx - 1][0]
+
+                # Between two stops, a threshold starts wherever the table
+                # changes color; runs of a stop's own color belong to it.
+                # Four digits are finer than the table's own resolution.
+                for step, color in enumerate(table):
+                    fraction = round(step / (self.size - 1), 4)
+
+                    if (
+                        low < fraction < high
+                        and color != last
+                        and color != high_color
+                    ):
+                        last = color
+
+                        yield fraction, color
+
+            last = high_color
+
+            yield high, high_color
+
+
+SPEC_PATTERN = re.compile(
+    r'''
+    ^\s*(?:
+        \#(?P<hex>[0-9a-f]{6}|[0-9a-f]{3})
+        |
+        (?P<kind>[a-z][a-z0-9_]*)\s*\(\s*(?P<args>[^()]*?)\s*\)
+    )\s*$
+    ''',
+    re.IGNORECASE | re.VERBOSE
+)
+
+SPEC_FLAGS = {
+    'true': 1,
+    'false': 0,
+}
+
+SPEC_KINDS = {
+    'rgb': (3, lambda r, g, b: RGBColor(r, g, b)),
+    'hsv': (3, lambda h, s, v: HSVColor(h, s, v).rgb),
+    'hsl': (3, lambda h, s, light: HSLColor(h, s, light).rgb),
+    'ansi': (2, lambda i, s: AnsiColor(i, s).rgb),
+    'xterm': (1, lambda i: XtermColor(i).rgb),
+    'gray': (1, lambda i: GrayscaleColor(i).rgb),
+    'grey': (1, lambda i: GrayscaleColor(i).rgb),
+    'grayscale': (1, lambda i: GrayscaleColor(i).rgb),
+    'cube6': (3, lambda r, g, b: Cube6Color(r, g, b).rgb),
+    'cube5': (3, lambda r, g, b: Cube5Color(r, g, b).rgb),
+    'cube6x': (3, lambda r, g, b: Cube6XtermColor(r, g, b).rgb),
+    'cube6_xterm': (3, lambda r, g, b: Cube6XtermColor(r, g, b).rgb),
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_color_spec(spec):
+    match = SPEC_PATTERN.match(spec)
+
+    if match is None:
+        return None
+
+    if match.group('hex') is not None:
+        digits = match.group('hex')
+        if len(digits) == 3:
+            digits = ''.join(digit * 2 for digit in digits)
+
+        return PackedColor(int(digits, 16)).rgb
+
+    kind = match.group('kind').casefold()
+
+    if kind not in SPEC_KINDS:
+        raise ValueError(
+            'Unknown color spec kind {kind!r} in {spec!r}'.format(
+                kind=kind,
+                spec=spec
+            )
+        )
+
+    arity, constructor = SPEC_KINDS[kind]
+    args = [
+        arg.strip()
+        for arg in match.group('args').split(',')
+        if arg.strip()
+    ]
+
+    if len(args) != arity:
+        raise ValueError(
+            '{kind}() takes {arity} values, not {count} in {spec!r}'.format(
+                kind=kind,
+                arity=arity,
+                count=len(args),
+                spec=spec
+            )
+        )
+
+    try:
+        values = [
+            SPEC_FLAGS[arg.casefold()]
+            if arg.casefold() in SPEC_FLAGS
+            else int(arg)
+            for arg in args
+        ]
+
+    except ValueError:
+        raise ValueError(
+            'Color spec values must be integers: {spec!r}'.format(spec=spec)
+        ) from None
+
+    return constructor(*values)
+
+
+class Palette:
+    def __init__(self, name, entries=()):
+        self.name = name
+        self.entries = {}
+        self.aliases = {}
+        self.materialized = {}
+
+        for color_name, value in (
+            entries.items() if hasattr(entries, 'items') else entries
+        ):
+            self.add(color_name, value)
+
+    def __repr__(self):
+        return 'Palette({name!r}, <{count} colors>)'.format(
+            name=self.name,
+            count=len(self)
+        )
+
+    @staticmethod
+    def normalize(name):
+        return str(name).casefold().replace('grey', 'gray')
+
+    def add(self, name, value):
+        if not isinstance(value, int):
+            value = pack_triplet(*(int(channel) for channel in value))
+
+        self.entries[name] = value
+        self.aliases.setdefault(Palette.normalize(name), name)
+        self.materialized.pop(name, None)
+
+    def resolve(self, name):
+        if name in self.entries:
+            return name
+
+        return self.aliases.get(Palette.normalize(name))
+
+    def get(self, name, default=None):
+        canonical = self.resolve(name)
+
+        if canonical is None:
+            return default
+
+        if canonical not in self.materialized:
+            self.materialized[canonical] = PackedColor(
+                self.entries[canonical]
+            ).rgb
+
+        return self.materialized[canonical]
+
+    def __getitem__(self, name):
+        color = self.get(name)
+
+        if color is None:
+            raise KeyError(name)
+
+        return color
+
+    def __contains__(self, name):
+        return self.resolve(name) is not None
+
+    def __iter__(self):
+        yield from self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PaletteRegistry:
+    def __init__(self):
+        self.loaders = collections.OrderedDict()
+        self.loaded = {}
+
+    def register(self, name, loader):
+        self.loaders[name] = loader
+        self.loaded.pop(name, None)
+
+    def __getitem__(self, name):
+        if name not in self.loaded:
+            self.loaded[name] = Palette(name, self.loaders[name]())
+
+        return self.loaded[name]
+
+    def __contains__(self, name):
+        return name in self.loaders
+
+    def __iter__(self):
+        yield from self.loaders
+
+    def lookup(self, name):
+        for palette_name in self:
+            color = self[palette_name].get(name)
+
+            if color is not None:
+                return color
+
+        return None
+
+
+def load_palette(name):
+    return config.yaml_read(
+        SEP.join(['config', 'colors', '.'.join([name, 'yaml'])]),
+        config_resource,
+        raw=True
+    )
+
+
+def load_xterm_names():
+    return {
+        name: XtermColor._reftbl[index]
+        for name, index in load_palette('xterm_names').items()
+    }
+
+
+palettes = PaletteRegistry()
+palettes.register('web', functools.partial(load_palette, 'web'))
+palettes.register('xterm', load_xterm_names)
+
+
 class ColorConfig(config.Base):
     def __init__(self):
-        for name, value in config.colors.web.items():
-            self.register_attr(
-                name,
-                functools.partial(
-                    lambda r, g, b: RGBColor(r, g, b),
-                    *value
-                ),
-                'The {name} color'.format(name=name)
-            )
+        self.register_attr(
+            'palettes',
+            lambda: palettes,
+            'The registry of named color palettes (web, xterm).'
+        )
 
         self.register_attr(
             'from_rgb',
@@ -896,3 +1564,79 @@ class ColorConfig(config.Base):
             lambda: lambda r, g, b: Cube6XtermColor(r, g, b).rgb,
             Cube6XtermColor.__doc__
         )
+
+        self.register_attr(
+            'from_packed',
+            lambda: lambda value: PackedColor(value).rgb,
+            PackedColor.__doc__
+        )
+
+        self.register_attr(
+            'Colormap',
+            lambda: Colormap.get,
+            ' '.join([
+                'Builds (or reuses) a precompiled multi-stop colormap from a',
+                'mapping of percentage stops to colors.'
+            ])
+        )
+
+        self.register_attr(
+            'parse',
+            lambda: parse_color_spec,
+            ' '.join([
+                'Parses a compact color spec such as #5f005f,',
+                'hsv(300,100,37), cube6x(4,0,4), gray(30) or xterm(53) into',
+                'a color, or',
+                'returns None when the text is not a compact spec.'
+            ])
+        )
+
+        self.register_attr(
+            'sample_gradient',
+            lambda: sample_gradient,
+            ' '.join([
+                'Samples exactly *count* evenly spaced colors between two',
+                'colors in the given color space, optionally quantized into',
+                'a target palette.'
+            ])
+        )
+
+    def __getattr__(self, name):
+        color = None if name.startswith('_') else palettes.lookup(name)
+
+        if color is None:
+            raise AttributeError(
+                '{cls!r} object has no attribute {name!r}'.format(
+                    cls=type(self).__name__,
+                    name=name
+                )
+            )
+
+        return color
+
+    def __getitem__(self, key):
+        color = palettes.lookup(key)
+
+        if color is not None:
+            return color
+
+        try:
+            return super().__getitem__(key)
+
+        except KeyError:
+            color = parse_color_spec(key) if isinstance(key, str) else None
+
+            if color is None:
+                raise
+
+            return color
+
+    def __contains__(self, key):
+        return palettes.lookup(key) is not None or super().__contains__(key)
+
+    def __iter__(self):
+        yield from super().__iter__()
+        yield from palettes['web']
+
+    def __len__(self):
+        return super().__len__() + len(palettes['web'])
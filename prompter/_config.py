@@ -1,8 +1,10 @@
+import contextlib
 import enum
 import functools
 import gzip
 import os
 import sys
+import threading
 
 import appdirs
 import pkg_resources
@@ -10,6 +12,11 @@ import yaml
 
 SEP = '/'
 NOT_LOADED = '<Not Loaded>'
+TRACE_KEYS = '<keys>'
+TRACE_HAS = '<has>'
+FINGERPRINT_CACHE = 1024
+
+tracer = threading.local()
 
 
 @enum.unique
@@ -130,7 +137,90 @@ def unpack_element(elem):
     return ret
 
 
-def yaml_read(filepath, resource=None, compressed=False, default_path=None):
+def get_traces():
+    return getattr(tracer, 'traces', ())
+
+
+@contextlib.contextmanager
+def trace_reads():
+    reads = {}
+    traces = get_traces()
+    tracer.traces = traces + (reads,)
+
+    try:
+        yield reads
+
+    finally:
+        tracer.traces = traces
+
+
+@contextlib.contextmanager
+def untraced():
+    traces = get_traces()
+    tracer.traces = ()
+
+    try:
+        yield
+
+    finally:
+        tracer.traces = traces
+
+
+@functools.lru_cache(maxsize=FINGERPRINT_CACHE)
+def frozen_fingerprint(value):
+    return repr(unpack_element(value))
+
+
+def fingerprint(value):
+    if hasattr(value, 'fingerprint'):
+        return value.fingerprint()
+
+    if isinstance(value, (tuple, frozenset)):
+        try:
+            return frozen_fingerprint(value)
+
+        except TypeError:
+            # Holds a config node, which is not hashable.
+            pass
+
+    return repr(unpack_element(value))
+
+
+def record_read(path, value):
+    traces = get_traces()
+
+    if traces and path is not None:
+        value = fingerprint(value)
+
+        for reads in traces:
+            reads[path] = value
+
+
+def read_path(roots, path):
+    ret = roots[path[0]]
+
+    keys = iter(path[1:])
+
+    for key in keys:
+        if key == TRACE_KEYS:
+            ret = tuple(ret)
+
+        elif key == TRACE_HAS:
+            ret = next(keys) in ret
+
+        else:
+            ret = getattr(ret, str(key))
+
+    return ret
+
+
+def yaml_read(
+    filepath,
+    resource=None,
+    compressed=False,
+    default_path=None,
+    raw=False
+):
     has_root = filepath.startswith(SEP)
     _load = lambda f: yaml.safe_load(f)
 
@@ -246,6 +336,9 @@ def yaml_read(filepath, resource=None, compressed=False, default_path=None):
         with open(filepath) as inp:
             data = _load(inp)
 
+    if raw:
+        return data
+
     return parse_element(data)
 
 
@@ -300,6 +393,19 @@ def yaml_write(filepath, data, compressed=False):
 
 
 class BaseConfig:
+    static_attrs = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if 'static_attrs' in cls.__dict__:
+            for name, value in cls.static_attrs.items():
+                setattr(
+                    cls,
+                    str(name),
+                    staticmethod(value) if callable(value) else value
+                )
+
     @property
     def __dict__(self):
         ret = vars(super()) if hasattr(super(), '__dict__') else {}
@@ -319,15 +425,15 @@ class BaseConfig:
         return repr(vars(self))
 
     def __getitem__(self, key):
-        ret = vars(self)[key]
+        if key not in self.__attr_set or key in self.bad_names:
+            self.__record_has(key, False)
 
-        if ret == NOT_LOADED:
-            ret = getattr(self, str(key))
+            raise KeyError(key)
 
-        return ret
+        return getattr(self, str(key))
 
     def __contains__(self, key):
-        return key in vars(self)
+        return self.__record_has(key, key in vars(self))
 
     def __str__(self):
         return str(vars(self))
@@ -336,16 +442,20 @@ class BaseConfig:
         return sys.getsizeof(vars(self))
 
     def __len__(self):
+        self.__record_keys()
+
         return len(vars(self))
 
     def __iter__(self):
+        self.__record_keys()
+
         yield from vars(self)
 
     def __eq__(self, other):
-        return vars(self) == other
+        return self.copy() == other
 
     def __ne__(self, other):
-        return vars(self) != other
+        return self.copy() != other
 
     def keys(self):
         yield from self
@@ -412,6 +522,8 @@ class BaseConfig:
             self.bad_names = {
                 'bad_names',
                 'register_attr',
+                'static_attrs',
+                'trace_path',
             } | {
                 ''.join(['_BaseConfig', attr])
                 for attr in {
@@ -419,6 +531,9 @@ class BaseConfig:
                     '__attr_set',
                     '__data',
                     '__internal_dict',
+                    '__record_has',
+                    '__record_keys',
+                    '__record_read',
                 }
             }
 
@@ -428,11 +543,23 @@ class BaseConfig:
     def bad_names(self, new_bad_names):
         self.__data['bad_names'] = new_bad_names
 
+    @property
+    def trace_path(self):
+        return self.__data.get('trace_path')
+
+    @trace_path.setter
+    def trace_path(self, new_trace_path):
+        self.__data['trace_path'] = new_trace_path
+
     def copy(self):
-        return vars(self).copy()
+        return dict(self.items())
 
     def get(self, key, default=None):
-        return vars(self).get(key, default)
+        try:
+            return self[key]
+
+        except KeyError:
+            return default
 
     def deepcopy(self):
         return unpack_element(self)
@@ -447,17 +574,38 @@ class BaseConfig:
     @property
     def __internal_dict(self):
         if 'internal_dict' not in self.__data:
-            self.__data['internal_dict'] = {}
+            self.__data['internal_dict'] = dict(self.static_attrs)
 
         return self.__data['internal_dict']
 
     @property
     def __attr_set(self):
         if 'attr_set' not in self.__data:
-            self.__data['attr_set'] = set()
+            self.__data['attr_set'] = set(self.static_attrs)
 
         return self.__data['attr_set']
 
+    def __record_keys(self):
+        if get_traces() and self.trace_path is not None:
+            record_read(self.trace_path + (TRACE_KEYS,), tuple(vars(self)))
+
+    def __record_has(self, key, value):
+        if get_traces() and self.trace_path is not None:
+            record_read(self.trace_path + (TRACE_HAS, key), value)
+
+        return value
+
+    def __record_read(self, name, value):
+        if (
+            get_traces()
+            and self.trace_path is not None
+            and not isinstance(value, BaseConfig)
+            and not callable(value)
+        ):
+            record_read(self.trace_path + (name,), value)
+
+        return value
+
     def register_attr(self, name, func, doc=None, setable=False):
         if doc is None:
             doc = 'The {name} attribute.'.format(name=name)
@@ -471,7 +619,7 @@ class BaseConfig:
                         )
                     )
 
-                return self.__internal_dict[name]
+                return self.__record_read(name, self.__internal_dict[name])
 
             def set(self, value):
                 if name in self.__internal_dict:
@@ -488,9 +636,19 @@ class BaseConfig:
         else:
             def get(self):
                 if name not in self.__internal_dict:
-                    self.__internal_dict[name] = func()
+                    with untraced():
+                        value = func()
 
-                return self.__internal_dict[name]
+                    if (
+                        isinstance(value, BaseConfig)
+                        and value.trace_path is None
+                        and self.trace_path is not None
+                    ):
+                        value.trace_path = self.trace_path + (name,)
+
+                    self.__internal_dict[name] = value
+
+                return self.__record_read(name, self.__internal_dict[name])
 
             attr_func = property(get, doc=doc)
 
@@ -578,6 +736,8 @@ class PathConfig(BaseConfig):
 
 class MainConfig(PathConfig):
     def __init__(self):
+        self.trace_path = ('config',)
+
         super().__init__()
 
         self.register_attr(
@@ -0,0 +1,130 @@
+import collections
+import getpass
+import os
+import pwd
+import socket
+
+from prompter import _metrics
+from prompter import config
+
+XTERM_TERM = 'xterm'
+XTERM_DEPTH = 256
+ANSI_DEPTH = 16
+
+
+def term_depth(term):
+    return (
+        XTERM_DEPTH
+        if term and term.casefold() == XTERM_TERM
+        else ANSI_DEPTH
+    )
+
+
+def is_xterm(environ=None):
+    if environ is None:
+        environ = os.environ
+
+    return term_depth(environ.get('TERM')) == XTERM_DEPTH
+
+
+def get_metrics():
+    return _metrics.get_backend(
+        config.settings.metrics_backend
+        if 'metrics_backend' in config.settings
+        else None,
+        config.settings.metrics_fixture
+        if 'metrics_fixture' in config.settings
+        else None
+    )
+
+
+def get_ttl():
+    return (
+        config.settings.metrics_ttl
+        if 'metrics_ttl' in config.settings
+        else 0
+    )
+
+
+def get_snapshot(metrics=None):
+    return _metrics.get_snapshot(
+        get_ttl(),
+        get_metrics() if metrics is None else metrics
+    )
+
+
+class RenderContext(collections.namedtuple(
+    'RenderContext',
+    'user uid host term depth superuser snapshot metrics'
+)):
+    __slots__ = ()
+
+    @property
+    def xterm(self):
+        return self.depth == XTERM_DEPTH
+
+    @property
+    def cpu_count(self):
+        return self.get_snapshot().cpu_count
+
+    @property
+    def mem_total(self):
+        return self.get_snapshot().mem_total
+
+    @property
+    def swap_total(self):
+        return self.get_snapshot().swap_total
+
+    def get_snapshot(self, metrics=None):
+        if self.snapshot is not None:
+            return self.snapshot
+
+        return get_snapshot(
+            self.metrics if self.metrics is not None else metrics
+        )
+
+    def fingerprint(self):
+        return repr(self._replace(
+            snapshot=(
+                self.snapshot.fingerprint()
+                if self.snapshot is not None
+                else None
+            ),
+            metrics=None
+        ))
+
+    @classmethod
+    def create(
+        cls,
+        user,
+        host,
+        term=XTERM_TERM,
+        uid=None,
+        snapshot=None,
+        metrics=None
+    ):
+        return cls(
+            user=user,
+            uid=uid,
+            host=host,
+            term=term,
+            depth=term_depth(term),
+            superuser=user in config.settings.user.super,
+            snapshot=snapshot,
+            metrics=metrics
+        )
+
+    @classmethod
+    def from_environ(cls, environ=None, metrics=None):
+        if environ is None:
+            environ = os.environ
+
+        user = getpass.getuser()
+
+        return cls.create(
+            user,
+            socket.gethostname(),
+            environ.get('TERM', ''),
+            uid=pwd.getpwnam(user).pw_uid,
+            metrics=metrics
+        )
@@ -0,0 +1,229 @@
+import concurrent.futures
+import itertools
+import os
+import shlex
+import socket
+import sys
+
+from prompter import _context
+from prompter import _metrics
+from prompter import _specs
+from prompter import config
+
+SUFFIX = '.ps1'
+CHUNK_SIZE = 16
+
+
+def get_users(settings=None):
+    if settings is None:
+        settings = config.settings
+
+    return list(dict.fromkeys(itertools.chain(
+        settings.user.super.keys(),
+        settings.user.normal.keys()
+    )))
+
+
+def get_hosts(settings=None):
+    if settings is None:
+        settings = config.settings
+
+    return list(settings.server.keys())
+
+
+def load_snapshot(metrics):
+    if isinstance(metrics, str):
+        return _metrics.FixtureBackend.from_file(metrics).capture()
+
+    return _metrics.from_totals(
+        metrics.mem_total,
+        metrics.swap_total,
+        metrics.cpu_count
+    )
+
+
+def get_snapshots(hosts, settings=None):
+    if settings is None:
+        settings = config.settings
+
+    local_host = socket.gethostname()
+    ret = {}
+
+    for host in hosts:
+        server = settings.server[host]
+
+        if 'metrics' in server:
+            ret[host] = load_snapshot(server.metrics)
+
+        elif host == local_host:
+            ret[host] = _context.get_snapshot()
+
+    return ret
+
+
+def get_path(out_dir, host, user):
+    return os.path.join(out_dir, host, ''.join([user, SUFFIX]))
+
+
+def write_atomic(path, data):
+    tmp_path = '.'.join([path, str(os.getpid()), 'tmp'])
+
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(data)
+
+        os.replace(tmp_path, path)
+
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        raise
+
+
+def render_prompt(context, xterm):
+    from prompter import make_prompt
+
+    key = (context.snapshot, xterm)
+    prompt = make_prompt.Prompt(context, xterm=xterm)
+
+    if key in shared:
+        prompt.segment_results.update(shared[key])
+
+    ret = prompt.prompt
+
+    if key not in shared:
+        identity = make_prompt.segments.dependents(
+            make_prompt.IDENTITY_SEGMENTS
+        )
+        shared[key] = {
+            name: value
+            for name, value in prompt.segment_results.items()
+            if name not in identity
+        }
+
+    return ret
+
+
+def render(context, out_dir):
+    from prompter import make_prompt
+
+    path = get_path(out_dir, context.host, context.user)
+    write_atomic(
+        path,
+        ''.join([
+            make_prompt.DUAL_FORMAT.format(
+                xterm=shlex.quote(render_prompt(context, True)),
+                ansi=shlex.quote(render_prompt(context, False))
+            ),
+            '\n',
+        ]).encode('utf-8')
+    )
+
+    return path
+
+
+def render_many(contexts, out_dir):
+    return [render(context, out_dir) for context in contexts]
+
+
+def gen_contexts(hosts, users, snapshots):
+    for host in hosts:
+        for user in users:
+            yield _context.RenderContext.create(
+                user,
+                host,
+                snapshot=snapshots.get(host)
+            )
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def generate(
+    out_dir,
+    hosts=None,
+    users=None,
+    workers=None,
+    snapshots=None
+):
+    from prompter import make_prompt
+
+    if hosts is None:
+        hosts = get_hosts()
+
+    if users is None:
+        users = get_users()
+
+    if snapshots is None:
+        snapshots = {}
+
+    if make_prompt.segments.metrics(make_prompt.Prompt().layout):
+        snapshots = dict(
+            get_snapshots([host for host in hosts if host not in snapshots]),
+            **snapshots
+        )
+        missing = sorted(host for host in hosts if host not in snapshots)
+
+        if missing:
+            raise ValueError(
+                ' '.join([
+                    'The prompt layout uses system metrics, but there are',
+                    'none for: {hosts}. Set server.<host>.metrics to',
+                    'mem_total and swap_total (in kB) and cpu_count, or to',
+                    'the path of a recorded metrics fixture.',
+                ]).format(hosts=', '.join(missing))
+            )
+
+    for host in hosts:
+        os.makedirs(os.path.join(out_dir, host), exist_ok=True)
+
+    contexts = list(gen_contexts(hosts, users, snapshots))
+
+    if not contexts:
+        return []
+
+    # Render one artifact up front so the parsed settings and the resolved
+    # colors are in memory before the workers fork from this process.
+    ret = render_many(contexts[:1], out_dir)
+
+    if workers == 1 or len(contexts) == 1:
+        ret.extend(render_many(contexts[1:], out_dir))
+
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            for paths in pool.map(
+                render_many,
+                chunked(contexts[1:], CHUNK_SIZE),
+                itertools.repeat(out_dir)
+            ):
+                ret.extend(paths)
+
+    _specs.get_resolver().save()
+
+    return ret
+
+
+shared = {}
+
+
+def main(args):
+    try:
+        paths = generate(args.out, workers=args.workers)
+
+    except ValueError as err:
+        sys.exit('prompter fleet: {err}'.format(err=err))
+
+    sys.stderr.write('Wrote {count} prompts to {out}\n'.format(
+        count=len(paths),
+        out=args.out
+    ))
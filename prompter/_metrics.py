@@ -0,0 +1,240 @@
+import abc
+import collections
+import functools
+import itertools
+import os
+import threading
+import time
+
+from prompter import _config
+
+PROC = '/proc'
+BUFFER_SIZE = 1 << 16
+DEFAULT_BACKEND = 'proc'
+
+
+class SystemSnapshot(collections.namedtuple(
+    'SystemSnapshot',
+    ' '.join([
+        'mem_total',
+        'mem_free',
+        'swap_total',
+        'swap_free',
+        'load_avg',
+        'cpu_count',
+        'captured',
+    ])
+)):
+    __slots__ = ()
+
+    def fingerprint(self):
+        return repr((self.mem_total, self.swap_total, self.cpu_count))
+
+
+def from_totals(mem_total, swap_total, cpu_count):
+    return SystemSnapshot(
+        mem_total=mem_total,
+        mem_free=None,
+        swap_total=swap_total,
+        swap_free=None,
+        load_avg=None,
+        cpu_count=cpu_count,
+        captured=0.0
+    )
+
+
+class MetricsBackend(abc.ABC):
+    def __init__(self):
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+    @abc.abstractmethod
+    def capture(self):
+        pass
+
+    def get_snapshot(self, ttl=0):
+        with self.lock:
+            if (
+                self.snapshot is None
+                or not ttl
+                or time.monotonic() - self.snapshot.captured >= ttl
+            ):
+                self.snapshot = self.capture()
+
+            return self.snapshot
+
+
+class ProcBackend(MetricsBackend):
+    def __init__(self, root=PROC):
+        super().__init__()
+        self.root = root
+        self.buffer = bytearray(BUFFER_SIZE)
+        self.view = memoryview(self.buffer)
+
+    def grow(self):
+        self.view.release()
+        self.buffer.extend(bytes(len(self.buffer)))
+        self.view = memoryview(self.buffer)
+
+    def read(self, name):
+        fd = os.open(os.path.join(self.root, name), os.O_RDONLY)
+        size = 0
+
+        try:
+            while True:
+                if size == len(self.buffer):
+                    self.grow()
+
+                count = os.readv(fd, [self.view[size:]])
+
+                if not count:
+                    break
+
+                size += count
+
+        finally:
+            os.close(fd)
+
+        return self.view[:size].tobytes()
+
+    def meminfo(self):
+        ret = {}
+
+        for line in self.read('meminfo').splitlines():
+            key, sep, value = line.partition(b':')
+
+            if sep:
+                ret[key] = int(value.split()[0])
+
+        return ret
+
+    def loadavg(self):
+        return tuple(
+            float(value)
+            for value in self.read('loadavg').split()[:3]
+        )
+
+    def cpu_count(self):
+        return sum(
+            1
+            for line in self.read('stat').splitlines()
+            if line.startswith(b'cpu') and line[3:4].isdigit()
+        ) or 1
+
+    def capture(self):
+        meminfo = self.meminfo()
+
+        return SystemSnapshot(
+            mem_total=meminfo[b'MemTotal'],
+            mem_free=meminfo[b'MemFree'],
+            swap_total=meminfo.get(b'SwapTotal', 0),
+            swap_free=meminfo.get(b'SwapFree', 0),
+            load_avg=self.loadavg(),
+            cpu_count=self.cpu_count(),
+            captured=time.monotonic()
+        )
+
+
+class PsutilBackend(MetricsBackend):
+    def capture(self):
+        import psutil
+
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+
+        return SystemSnapshot(
+            mem_total=memory.total // 1024,
+            mem_free=memory.free // 1024,
+            swap_total=swap.total // 1024,
+            swap_free=swap.free // 1024,
+            load_avg=os.getloadavg(),
+            cpu_count=os.cpu_count() or 1,
+            captured=time.monotonic()
+        )
+
+
+class FixtureBackend(MetricsBackend):
+    def __init__(self, snapshots):
+        super().__init__()
+        self.snapshots = [
+            snapshot
+            if isinstance(snapshot, SystemSnapshot)
+            else SystemSnapshot(**dict(
+                snapshot,
+                load_avg=tuple(snapshot['load_avg']),
+                captured=snapshot.get('captured', 0.0)
+            ))
+            for snapshot in snapshots
+        ]
+
+        if not self.snapshots:
+            raise ValueError('A fixture needs at least one snapshot.')
+
+        self.replay = itertools.cycle(self.snapshots)
+
+    @classmethod
+    def from_file(cls, filepath, compressed=False):
+        return cls(_config.yaml_read(
+            filepath,
+            compressed=compressed,
+            raw=True
+        ))
+
+    def capture(self):
+        return next(self.replay)._replace(captured=time.monotonic())
+
+
+def record(backend, count=1, interval=0):
+    ret = []
+
+    for ndx in range(count):
+        if ndx and interval:
+            time.sleep(interval)
+
+        snapshot = backend.capture()
+        ret.append(dict(
+            snapshot._asdict(),
+            load_avg=list(snapshot.load_avg)
+        ))
+
+    return ret
+
+
+BACKENDS = collections.OrderedDict([
+    ('proc', ProcBackend),
+    ('psutil', PsutilBackend),
+])
+
+
+@functools.lru_cache(maxsize=None)
+def get_backend(name=None, fixture=None):
+    if name is None:
+        name = (
+            DEFAULT_BACKEND
+            if os.path.exists(os.path.join(PROC, 'meminfo'))
+            else 'psutil'
+        )
+
+    if name == 'fixture':
+        if fixture is None:
+            raise ValueError('The fixture backend needs a fixture file.')
+
+        return FixtureBackend.from_file(fixture)
+
+    try:
+        return BACKENDS[name]()
+
+    except KeyError:
+        raise ValueError(
+            'Unknown metrics backend {name!r}; expected one of {names}'.format(
+                name=name,
+                names=', '.join(list(BACKENDS) + ['fixture'])
+            )
+        ) from None
+
+
+def get_snapshot(ttl=0, backend=None):
+    if not isinstance(backend, MetricsBackend):
+        backend = get_backend(backend)
+
+    return backend.get_snapshot(ttl)
@@ -0,0 +1,140 @@
+import functools
+import math
+
+GRID_CELLS = 16
+
+LINEAR_TABLE = tuple(
+    channel / 255 / 12.92
+    if channel / 255 <= 0.04045
+    else ((channel / 255 + 0.055) / 1.055) ** 2.4
+    for channel in range(256)
+)
+
+
+def rgb_to_oklab(red, green, blue):
+    red = LINEAR_TABLE[red]
+    green = LINEAR_TABLE[green]
+    blue = LINEAR_TABLE[blue]
+
+    long_ = 0.4122214708 * red + 0.5363325363 * green + 0.0514459929 * blue
+    medium = 0.2119034982 * red + 0.6806995451 * green + 0.1073969566 * blue
+    short = 0.0883024619 * red + 0.2817188376 * green + 0.6299787005 * blue
+
+    long_ = math.copysign(abs(long_) ** (1 / 3), long_)
+    medium = math.copysign(abs(medium) ** (1 / 3), medium)
+    short = math.copysign(abs(short) ** (1 / 3), short)
+
+    return (
+        0.2104542553 * long_ + 0.7936177850 * medium - 0.0040720468 * short,
+        1.9779984951 * long_ - 2.4285922050 * medium + 0.4505937099 * short,
+        0.0259040371 * long_ + 0.7827717662 * medium - 0.8086757660 * short,
+    )
+
+
+def packed_to_oklab(packed):
+    return rgb_to_oklab(packed >> 16, (packed >> 8) & 0xff, packed & 0xff)
+
+
+def distance(first, second):
+    return (
+        (first[0] - second[0]) ** 2
+        + (first[1] - second[1]) ** 2
+        + (first[2] - second[2]) ** 2
+    )
+
+
+class PaletteIndex:
+    def __init__(self, palette, cells=GRID_CELLS, cache_size=4096):
+        self.points = []
+        seen = set()
+
+        for ndx, rgb in enumerate(palette):
+            rgb = tuple(rgb)
+            if rgb not in seen:
+                seen.add(rgb)
+                self.points.append((rgb_to_oklab(*rgb), ndx))
+
+        self.cells = cells
+        self.low = tuple(
+            min(point[axis] for point, ndx in self.points)
+            for axis in range(3)
+        )
+        self.size = tuple(
+            max(
+                (max(point[axis] for point, ndx in self.points) - low)
+                / cells,
+                1e-9
+            )
+            for axis, low in enumerate(self.low)
+        )
+
+        self.candidates = {}
+        self.nearest = functools.lru_cache(maxsize=cache_size)(self.search)
+
+    def cell(self, point):
+        return tuple(
+            min(
+                max(int((point[axis] - self.low[axis]) / self.size[axis]), 0),
+                self.cells - 1
+            )
+            for axis in range(3)
+        )
+
+    def bounds(self, cell):
+        return tuple(
+            (
+                self.low[axis] + cell[axis] * self.size[axis],
+                self.low[axis] + (cell[axis] + 1) * self.size[axis],
+            )
+            for axis in range(3)
+        )
+
+    @staticmethod
+    def box_distances(point, bounds):
+        near = far = 0
+
+        for value, (low, high) in zip(point, bounds):
+            if value < low:
+                near += (low - value) ** 2
+            elif value > high:
+                near += (value - high) ** 2
+
+            far += max(value - low, high - value) ** 2
+
+        return near, far
+
+    def cell_candidates(self, cell):
+        if cell not in self.candidates:
+            bounds = self.bounds(cell)
+            distances = [
+                (self.box_distances(point, bounds), point, ndx)
+                for point, ndx in self.points
+            ]
+            limit = min(far for (near, far), point, ndx in distances)
+
+            self.candidates[cell] = tuple(
+                (point, ndx)
+                for (near, far), point, ndx in distances
+                if near <= limit
+            )
+
+        return self.candidates[cell]
+
+    def search(self, packed):
+        point = packed_to_oklab(packed)
+
+        return min(
+            self.cell_candidates(self.cell(point)),
+            key=lambda item: (distance(point, item[0]), item[1])
+        )[1]
+
+    def __call__(self, packed):
+        return self.nearest(packed)
+
+    def brute_force(self, packed):
+        point = packed_to_oklab(packed)
+
+        return min(
+            self.points,
+            key=lambda item: (distance(point, item[0]), item[1])
+        )[1]
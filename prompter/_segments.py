@@ -0,0 +1,531 @@
+import collections
+import concurrent.futures
+import functools
+import os
+import pickle
+import string
+import threading
+import time
+
+import appdirs
+
+from prompter import _colors
+from prompter import _config
+from prompter import config
+
+SEP = '.'
+CACHE_FILE = 'segments.pickle'
+CACHE_VARIANTS = 4
+
+Segment = collections.namedtuple(
+    'Segment',
+    'name func deps inputs metrics text doc'
+)
+
+Slot = collections.namedtuple('Slot', 'name style')
+Plan = collections.namedtuple('Plan', 'pieces roots')
+CacheEntry = collections.namedtuple('CacheEntry', 'reads deps value')
+
+
+def get_path(source, path):
+    for key in path.split(SEP):
+        source = source[key]
+
+    return source
+
+
+@functools.lru_cache(maxsize=64)
+def compile_template(template):
+    pieces = []
+    roots = []
+
+    for literal, field, style, conversion in string.Formatter().parse(
+        template
+    ):
+        if literal:
+            if pieces and isinstance(pieces[-1], str):
+                pieces[-1] = ''.join([pieces[-1], literal])
+            else:
+                pieces.append(literal)
+
+        if field is None:
+            continue
+
+        if not field or conversion is not None:
+            raise ValueError(
+                'Invalid template field {field!r} in {template!r}'.format(
+                    field=''.join([
+                        '{',
+                        field,
+                        '!{}'.format(conversion) if conversion else '',
+                        ':{}'.format(style) if style else '',
+                        '}',
+                    ]),
+                    template=template
+                )
+            )
+
+        pieces.append(Slot(field, style or None))
+
+        if field not in roots:
+            roots.append(field)
+
+    return Plan(tuple(pieces), tuple(roots))
+
+
+class SegmentCache:
+    def __init__(self, cache_dir=None, state=None):
+        self.cache_path = (
+            os.path.join(cache_dir, CACHE_FILE)
+            if cache_dir is not None
+            else None
+        )
+        self.state = state
+        self.entries = {}
+        self.rendered = collections.OrderedDict()
+        self.reused = set()
+        self.dirty = False
+        self.lock = threading.Lock()
+
+        self.load()
+
+    def deps(self, segment, results):
+        return tuple(
+            _config.fingerprint(results[dep])
+            for dep in segment.deps
+        )
+
+    def is_current(self, entry, roots):
+        for path, value in entry.reads.items():
+            try:
+                current = _config.read_path(roots, path)
+
+            except (AttributeError, KeyError):
+                return False
+
+            if _config.fingerprint(current) != value:
+                return False
+
+        return True
+
+    def lookup(self, segment, roots, results):
+        deps = self.deps(segment, results)
+
+        for entry in self.entries.get(segment.name, ()):
+            if entry.deps == deps and self.is_current(entry, roots):
+                with self.lock:
+                    self.reused.add(segment.name)
+
+                return entry
+
+        return None
+
+    def store(self, segment, reads, results, value):
+        entry = CacheEntry(reads, self.deps(segment, results), value)
+
+        with self.lock:
+            self.entries[segment.name] = [entry] + [
+                other
+                for other in self.entries.get(segment.name, ())
+                if other.reads != entry.reads or other.deps != entry.deps
+            ][:CACHE_VARIANTS - 1]
+            self.dirty = True
+
+    def finish(self, raw, func):
+        with self.lock:
+            if raw in self.rendered:
+                self.rendered.move_to_end(raw)
+
+                return self.rendered[raw]
+
+        ret = func(raw)
+
+        with self.lock:
+            self.rendered[raw] = ret
+
+            while len(self.rendered) > CACHE_VARIANTS:
+                self.rendered.popitem(last=False)
+
+            self.dirty = True
+
+        return ret
+
+    def load(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, 'rb') as inp:
+                state, entries, rendered = pickle.load(inp)
+
+        except (
+            OSError,
+            EOFError,
+            AttributeError,
+            ValueError,
+            pickle.UnpicklingError
+        ):
+            return
+
+        if state == self.state:
+            self.entries = entries
+            self.rendered = rendered
+
+    def save(self):
+        if self.cache_path is None or not self.dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+
+        tmp_path = '.'.join([self.cache_path, str(os.getpid()), 'tmp'])
+        with open(tmp_path, 'wb') as out:
+            pickle.dump(
+                (self.state, self.entries, self.rendered),
+                out,
+                pickle.HIGHEST_PROTOCOL
+            )
+
+        os.replace(tmp_path, self.cache_path)
+        self.dirty = False
+
+
+class SegmentRegistry:
+    def __init__(self):
+        self.segments = collections.OrderedDict()
+
+    def __contains__(self, name):
+        return name in self.segments
+
+    def __getitem__(self, name):
+        return self.segments[name]
+
+    def __iter__(self):
+        yield from self.segments.values()
+
+    def __len__(self):
+        return len(self.segments)
+
+    def register(
+        self,
+        name,
+        deps=(),
+        inputs=None,
+        metrics=(),
+        text=True,
+        doc=None
+    ):
+        def decorator(func):
+            self.segments[name] = Segment(
+                name,
+                func,
+                tuple(deps),
+                dict(inputs or {}),
+                tuple(metrics),
+                text,
+                doc
+            )
+
+            return func
+
+        return decorator
+
+    def compile(self, template):
+        plan = compile_template(template)
+
+        for piece in plan.pieces:
+            if isinstance(piece, str):
+                continue
+
+            if piece.name not in self.segments:
+                raise ValueError(
+                    'Unknown segment {name!r} in template {template!r}'.format(
+                        name=piece.name,
+                        template=template
+                    )
+                )
+
+            segment = self.segments[piece.name]
+
+            if not segment.text:
+                raise ValueError(
+                    ' '.join([
+                        'Segment {name!r} produces a color, not text, and',
+                        'cannot be used in template {template!r}',
+                    ]).format(
+                        name=piece.name,
+                        template=template
+                    )
+                )
+
+            if piece.style is not None and 'value' not in segment.inputs:
+                raise ValueError(
+                    ' '.join([
+                        'Segment {name!r} has no color to style in',
+                        'template {template!r}',
+                    ]).format(
+                        name=piece.name,
+                        template=template
+                    )
+                )
+
+        return plan
+
+    def order(self, roots):
+        ret = []
+        done = set()
+        active = []
+
+        def visit(name):
+            if name in done:
+                return
+
+            if name not in self.segments:
+                raise KeyError(
+                    'Unknown segment {name!r} (required by {path})'.format(
+                        name=name,
+                        path=' -> '.join(active) or 'the layout'
+                    )
+                )
+
+            if name in active:
+                raise ValueError(
+                    'Segment dependency cycle: {path}'.format(
+                        path=' -> '.join(active[active.index(name):] + [name])
+                    )
+                )
+
+            active.append(name)
+
+            for dep in self.segments[name].deps:
+                visit(dep)
+
+            active.pop()
+            done.add(name)
+            ret.append(name)
+
+        for root in roots:
+            visit(root)
+
+        return ret
+
+    def reachable(self, roots):
+        return [self.segments[name] for name in self.order(roots)]
+
+    def dependents(self, names):
+        ret = set(names)
+
+        for segment in self.reachable([segment.name for segment in self]):
+            if ret.intersection(segment.deps):
+                ret.add(segment.name)
+
+        return ret
+
+    def inputs(self, roots):
+        return sorted({
+            path
+            for segment in self.reachable(roots)
+            for path in segment.inputs.values()
+        })
+
+    def metrics(self, roots):
+        return sorted({
+            metric
+            for segment in self.reachable(roots)
+            for metric in segment.metrics
+        })
+
+    def evaluate_one(self, segment, context, results, style=None):
+        kwargs = {dep: results[dep] for dep in segment.deps}
+        kwargs.update({
+            key: get_path(config.settings, path)
+            for key, path in segment.inputs.items()
+        })
+
+        if segment.metrics:
+            kwargs['snapshot'] = context.snapshot
+
+        if style is not None:
+            if 'value' not in segment.inputs:
+                raise ValueError(
+                    'Segment {name!r} has no color to style'.format(
+                        name=segment.name
+                    )
+                )
+
+            kwargs['value'] = style
+
+        return segment.func(context, **kwargs)
+
+    def cached(self, segment, context, results, cache):
+        roots = {'config': config, 'prompt': context}
+        entry = cache.lookup(segment, roots, results)
+
+        if entry is not None:
+            return entry.value
+
+        with _config.trace_reads() as reads:
+            ret = self.evaluate_one(segment, context, results)
+
+        cache.store(segment, reads, results, ret)
+
+        return ret
+
+    def timed(self, segment, context, results, timings, cache=None):
+        start = time.perf_counter()
+
+        if cache is None:
+            ret = self.evaluate_one(segment, context, results)
+
+        else:
+            ret = self.cached(segment, context, results, cache)
+
+        timings[segment.name] = time.perf_counter() - start
+
+        return ret
+
+    def evaluate_parallel(
+        self,
+        order,
+        context,
+        results,
+        workers,
+        timings,
+        cache=None
+    ):
+        waiting = {
+            name: {
+                dep
+                for dep in self.segments[name].deps
+                if dep not in results
+            }
+            for name in order
+        }
+        dependents = collections.defaultdict(list)
+
+        for name in order:
+            for dep in waiting[name]:
+                dependents[dep].append(name)
+
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            running = {}
+
+            def submit(name):
+                future = pool.submit(
+                    self.timed,
+                    self.segments[name],
+                    context,
+                    results,
+                    timings,
+                    cache
+                )
+                running[future] = name
+
+            for name in order:
+                if not waiting[name]:
+                    submit(name)
+
+            while running:
+                done, pending = concurrent.futures.wait(
+                    running,
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+                for future in sorted(done, key=lambda item: running[item]):
+                    name = running.pop(future)
+                    results[name] = future.result()
+
+                    for dependent in dependents[name]:
+                        waiting[dependent].discard(name)
+
+                        if not waiting[dependent]:
+                            submit(dependent)
+
+        return results
+
+    def evaluate(
+        self,
+        roots,
+        context,
+        results=None,
+        workers=1,
+        timings=None,
+        cache=None
+    ):
+        if results is None:
+            results = {}
+
+        if timings is None:
+            timings = {}
+
+        order = [name for name in self.order(roots) if name not in results]
+
+        if workers > 1 and len(order) > 1:
+            return self.evaluate_parallel(
+                order,
+                context,
+                results,
+                workers,
+                timings,
+                cache
+            )
+
+        for name in order:
+            results[name] = self.timed(
+                self.segments[name],
+                context,
+                results,
+                timings,
+                cache
+            )
+
+        return results
+
+    def render(
+        self,
+        plan,
+        context,
+        results=None,
+        workers=1,
+        timings=None,
+        cache=None
+    ):
+        results = self.evaluate(
+            plan.roots,
+            context,
+            results,
+            workers,
+            timings,
+            cache
+        )
+
+        return ''.join([
+            piece
+            if isinstance(piece, str)
+            else results[piece.name]
+            if piece.style is None
+            else self.evaluate_one(
+                self.segments[piece.name],
+                context,
+                results,
+                piece.style
+            )
+            for piece in plan.pieces
+        ])
+
+
+def get_cache():
+    global cache
+
+    if cache is None:
+        settings = config.settings
+
+        if 'segment_cache' in settings and settings.segment_cache:
+            cache = SegmentCache(
+                appdirs.user_cache_dir('prompter'),
+                _colors.color_state()
+            )
+
+    return cache
+
+
+cache = None
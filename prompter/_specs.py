@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+
+import appdirs
+
+from prompter import colors
+from prompter import config
+
+CACHE_NAME = 'specs-{digest}.json'
+
+KINDS = (
+    'cube6',
+    'cube5',
+    'cube6_xterm',
+    'ansi',
+    'xterm',
+    'rgb',
+    'hsv',
+    'hsl',
+    'grayscale',
+)
+
+CONSTRUCTORS = {
+    'name': lambda name: colors[name],
+    'cube6': lambda params: colors.from_cube6(**dict(params)),
+    'cube5': lambda params: colors.from_cube5(**dict(params)),
+    'cube6_xterm': lambda params: colors.from_cube6_xterm(**dict(params)),
+    'ansi': lambda params: colors.from_ansi(**dict(params)),
+    'xterm': lambda index: colors.from_xterm(index),
+    'rgb': lambda params: colors.from_rgb(**dict(params)),
+    'hsv': lambda params: colors.from_hsv(**dict(params)),
+    'hsl': lambda params: colors.from_hsl(**dict(params)),
+    'grayscale': lambda index: colors.from_grayscale(index),
+}
+
+
+def freeze(value):
+    if hasattr(value, 'keys'):
+        return tuple(sorted(
+            (key, freeze(value[key]))
+            for key in value.keys()
+        ))
+
+    elif isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+
+    else:
+        return value
+
+
+def thaw(value):
+    if isinstance(value, list):
+        return tuple(thaw(item) for item in value)
+
+    else:
+        return value
+
+
+def canonicalize(value):
+    if hasattr(value, 'keys'):
+        kinds = set(value.keys())
+
+        for kind in KINDS:
+            if kind in kinds:
+                return kind, freeze(value[kind])
+
+        return 'name', 'Black'
+
+    else:
+        return 'name', value
+
+
+def settings_digest():
+    return hashlib.sha1(
+        repr(config.settings.deepcopy()).encode('utf-8')
+    ).hexdigest()
+
+
+class SpecResolver:
+    def __init__(self, cache_dir=None):
+        self.resolved = {}
+        self.canonical = {}
+        self.dirty = False
+
+        if cache_dir is None:
+            self.cache_path = None
+
+        else:
+            self.cache_path = os.path.join(
+                cache_dir,
+                CACHE_NAME.format(digest=settings_digest())
+            )
+            self.load()
+
+    def key(self, value):
+        if not isinstance(value, config.Base):
+            return canonicalize(value)
+
+        try:
+            node, key = self.canonical[id(value)]
+
+        except KeyError:
+            node, key = self.canonical.setdefault(
+                id(value),
+                (value, canonicalize(value))
+            )
+
+        return key
+
+    def resolve(self, value):
+        key = self.key(value)
+
+        try:
+            return self.resolved[key]
+
+        except KeyError:
+            kind, params = key
+            color = CONSTRUCTORS[kind](params)
+            self.resolved[key] = color
+            self.dirty = True
+
+            return color
+
+    def load(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path) as inp:
+                entries = json.load(inp)
+
+        except (OSError, ValueError):
+            return
+
+        for kind, params, packed in entries:
+            self.resolved[(kind, thaw(params))] = colors.from_packed(packed)
+
+    def save(self):
+        if self.cache_path is None or not self.dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+
+        tmp_path = '.'.join([self.cache_path, str(os.getpid()), 'tmp'])
+        with open(tmp_path, 'w') as out:
+            json.dump(
+                [
+                    [kind, params, color.packed]
+                    for (kind, params), color in self.resolved.items()
+                ],
+                out
+            )
+
+        os.replace(tmp_path, self.cache_path)
+        self.dirty = False
+
+
+def get_resolver():
+    global resolver
+
+    if resolver is None:
+        settings = config.settings
+
+        if 'spec_cache' in settings and settings.spec_cache:
+            resolver = SpecResolver(appdirs.user_cache_dir('prompter'))
+
+        else:
+            resolver = SpecResolver()
+
+    return resolver
+
+
+def resolve(value):
+    return get_resolver().resolve(value)
+
+
+resolver = None
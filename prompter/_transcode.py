@@ -0,0 +1,176 @@
+import functools
+import re
+import sys
+
+from prompter import _colors
+
+DEPTHS = (16, 256)
+CHUNK_SIZE = 1 << 16
+HOLDBACK = 256
+TABLE_SIZE = 4096
+
+SGR = re.compile(rb'\x1b\[([0-9;]*)m')
+PARTIAL = re.compile(rb'\x1b(?:\[[0-9;]*)?')
+
+
+def ansi_code(index, back=False):
+    base = 40 if back else 30
+
+    if index < 8:
+        return base + index
+
+    return base + 60 + index - 8
+
+
+@functools.lru_cache(maxsize=None)
+def xterm_to_ansi():
+    return tuple(
+        index
+        if index < 16
+        else _colors.PackedColor.from_rgb(
+            _colors.XtermColor(index).rgb
+        ).to_ansi()
+        for index in range(256)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def ansi_codes(back=False):
+    return tuple(ansi_code(index, back) for index in xterm_to_ansi())
+
+
+def rgb_to_xterm(red, green, blue):
+    return _colors.PackedColor(
+        _colors.pack_triplet(red, green, blue)
+    ).to_xterm()
+
+
+class SgrTable(dict):
+    def __init__(self, depth, maxsize=TABLE_SIZE):
+        if depth not in DEPTHS:
+            raise ValueError(
+                'depth must be one of {depths!r}, not {depth!r}'.format(
+                    depths=DEPTHS,
+                    depth=depth
+                )
+            )
+
+        self.depth = depth
+        self.maxsize = maxsize
+        self.fore = ansi_codes()
+        self.back = ansi_codes(True)
+
+    def color(self, code, params):
+        mode = params.pop(0)
+
+        if mode == 5:
+            index = params.pop(0)
+
+        elif mode == 2:
+            red, green, blue = (params.pop(0) for _ in range(3))
+            index = rgb_to_xterm(red, green, blue)
+
+        else:
+            raise ValueError('Malformed extended color')
+
+        if not 0 <= index <= 255:
+            raise ValueError('Color index out of range')
+
+        if self.depth == 256:
+            return [code, 5, index]
+
+        elif code == 38:
+            return [self.fore[index]]
+
+        else:
+            return [self.back[index]]
+
+    def translate(self, params):
+        codes = [int(param) if param else 0 for param in params.split(b';')]
+        ret = []
+
+        while codes:
+            code = codes.pop(0)
+
+            if code in (38, 48):
+                ret.extend(self.color(code, codes))
+
+            else:
+                ret.append(code)
+
+        return b';'.join(str(code).encode('ascii') for code in ret)
+
+    def __missing__(self, params):
+        try:
+            ret = b''.join([b'\x1b[', self.translate(params), b'm'])
+
+        except (IndexError, ValueError):
+            ret = b''.join([b'\x1b[', params, b'm'])
+
+        if len(self) >= self.maxsize:
+            del self[next(iter(self))]
+
+        self[params] = ret
+
+        return ret
+
+
+class Transcoder:
+    def __init__(self, depth):
+        self.table = SgrTable(depth)
+        self.pending = b''
+
+    def convert(self, data):
+        if b'\x1b' not in data:
+            return data
+
+        parts = SGR.split(data)
+        parts[1::2] = map(self.table.__getitem__, parts[1::2])
+
+        return b''.join(parts)
+
+    def feed(self, chunk):
+        data = b''.join([self.pending, chunk]) if self.pending else chunk
+        split = data.rfind(b'\x1b', max(len(data) - HOLDBACK, 0))
+
+        if split != -1 and PARTIAL.fullmatch(data, split):
+            self.pending = data[split:]
+            data = data[:split]
+
+        else:
+            self.pending = b''
+
+        return self.convert(data)
+
+    def finish(self):
+        data = self.pending
+        self.pending = b''
+
+        return self.convert(data)
+
+
+def transcode(inp, out, depth, chunk_size=CHUNK_SIZE):
+    transcoder = Transcoder(depth)
+    read = inp.read1 if hasattr(inp, 'read1') else inp.read
+
+    while True:
+        chunk = read(chunk_size)
+
+        if not chunk:
+            break
+
+        out.write(transcoder.feed(chunk))
+        out.flush()
+
+    out.write(transcoder.finish())
+    out.flush()
+
+
+def transcode_bytes(data, depth):
+    transcoder = Transcoder(depth)
+
+    return b''.join([transcoder.feed(data), transcoder.finish()])
+
+
+def main(args):
+    transcode(sys.stdin.buffer, sys.stdout.buffer, args.depth)
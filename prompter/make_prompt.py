@@ -1,22 +1,16 @@
 #!/usr/bin/env python3
 
-import getpass
-import multiprocessing
-import os
-import pwd
-import socket
-
-import psutil
+import functools
+import shlex
+import sys
 
+from prompter import _context
+from prompter import _segments
+from prompter import _specs
 from prompter import ansi
 from prompter import colors
 from prompter import config
 
-USERDATA = pwd.getpwnam(getpass.getuser())
-XTERM = 'TERM' in os.environ and os.environ['TERM'].casefold() == 'xterm'
-HOSTNAME = socket.gethostname()
-SUPER = USERDATA.pw_name in config.settings.user.super
-
 USER = r'\u'
 AT = '@'
 HOST = r'\h'
@@ -28,6 +22,7 @@ SWAP_SEP = '/'
 SWAP_UNITS = 'MB'
 MEM_SYS_SEP = '\t'
 SYS_SEP = ' '
+TEMPLATE = '{mem_sys}\n{user_host_path}\n{test}'
 PROCS_SEP = '/'
 DIRNAME = ''.join([
     r'$(',
@@ -125,6 +120,14 @@ SWAP_TOTAL = ''.join([
     ')',
 ])
 
+IDENTITY_SEGMENTS = ('usercolor', 'hostcolor', 'user_host')
+DUAL_FORMAT = ' '.join([
+    'if [[ ${{TERM,,}} == xterm ]];',
+    'then PS1={xterm};',
+    'else PS1={ansi};',
+    'fi',
+])
+
 LOAD_1M_FORMAT = ''.join([
     '$(',
     '; '.join([
@@ -249,8 +252,11 @@ LAST_PID = ''.join([
 ])
 
 
-def get_fore_color(color):
-    if XTERM:
+def get_fore_color(color, xterm=None):
+    if xterm is None:
+        xterm = _context.is_xterm()
+
+    if xterm:
         seq = ansi.seq.ColorText
     else:
         seq = ansi.seq.AnsiColorText
@@ -258,8 +264,11 @@ def get_fore_color(color):
     return seq(color)
 
 
-def get_back_color(color):
-    if XTERM:
+def get_back_color(color, xterm=None):
+    if xterm is None:
+        xterm = _context.is_xterm()
+
+    if xterm:
         seq = ansi.seq.ColorBack
     else:
         seq = ansi.seq.AnsiColorBack
@@ -267,14 +276,14 @@ def get_back_color(color):
     return seq(color)
 
 
-def get_color(fore=None, back=None):
+def get_color(fore=None, back=None, xterm=None):
     items = []
 
     if fore is not None:
-        items.append(get_fore_color(fore))
+        items.append(get_fore_color(fore, xterm))
 
     if back is not None:
-        items.append(get_back_color(back))
+        items.append(get_back_color(back, xterm))
 
     if items:
         return sum(items)
@@ -283,108 +292,69 @@ def get_color(fore=None, back=None):
 
 
 def get_color_from_config(value):
-    if isinstance(value, config.Base):  # Is a defined color.
-        if 'cube6' in value:
-            return colors.from_cube6(**value.cube6)
-        elif 'cube5' in value:
-            return colors.from_cube5(**value.cube5)
-        elif 'cube6_xterm' in value:
-            return colors.from_cube6_xterm(**value.cube6_xterm)
-        elif 'ansi' in value:
-            return colors.from_ansi(**value.ansi)
-        elif 'xterm' in value:
-            return colors.from_xterm(value.xterm)
-        elif 'rgb' in value:
-            return colors.from_rgb(**value.rgb)
-        elif 'hsv' in value:
-            return colors.from_hsv(**value.hsv)
-        elif 'hsl' in value:
-            return colors.from_hsl(**value.hsl)
-        elif 'grayscale' in value:
-            return colors.from_grayscale(value.grayscale)
-        else:
-            return colors.Black
+    return _specs.resolve(value)
 
-    else:  # Specifies a named color
-        return colors[value]
 
+def get_range_colormap(range):
+    stops = {pct: range[pct] for pct in range.keys()}
 
-def gen_pct_range_gradient(range):
-    ttl_keys = sorted(list(range.keys()))
-    key_range = zip(ttl_keys[:-1], ttl_keys[1:])
-
-    last_high = 0
-
-    used = set()
-
-    first = True
-
-    for low, high in key_range:
-        low_color = range[low]
-        high_color = range[high]
-        if not isinstance(range[low], int) or not isinstance(range[high], int):
-            low_color = get_color_from_config(low_color)
-            high_color = get_color_from_config(high_color)
-
-            if XTERM:
-                color_gradient = list(
-                    low_color.cube6_xterm.gen_hsv_gradient(high_color)
-                )
-            else:
-                color_gradient = list(
-                    low_color.ansi.gen_hsv_gradient(high_color)
-                )
-
-        else:
-            low_color = colors.from_grayscale(low_color)
-            high_color = colors.from_grayscale(high_color)
+    if all(isinstance(value, int) for value in stops.values()):
+        return colors.Colormap(
+            {
+                pct: colors.from_grayscale(value)
+                for pct, value in stops.items()
+            },
+            space='grayscale'
+        )
 
-            if XTERM:
-                color_gradient = list(
-                    low_color.xterm.gen_grayscale_gradient(high_color)
-                )
-            else:
-                color_gradient = list(
-                    low_color.ansi.gen_grayscale_gradient(high_color)
+    else:
+        return colors.Colormap(
+            {
+                pct: (
+                    colors.from_grayscale(value)
+                    if isinstance(value, int)
+                    else get_color_from_config(value)
                 )
+                for pct, value in stops.items()
+            },
+            space='hsv'
+        )
 
-        if not first:
-            color_gradient = color_gradient[1:]
 
-        last_pct = 0
+def gen_pct_range_gradient(range, xterm=None):
+    if xterm is None:
+        xterm = _context.is_xterm()
 
-        for ndx, color in enumerate(color_gradient):
-            pct = last_high + (
-                (ndx + (0 if first else 1)) * (
-                    (high - low) / (len(color_gradient) - (1 if first else 0))
-                ) / 100
-            )
+    colormap = get_range_colormap(range)
 
-            if hasattr(color, 'rgb'):
-                color = color.rgb
-
-            if pct not in used:
-                last_pct = pct
-                used.add(pct)
+    if not xterm:
+        palette = 'ansi'
+    elif colormap.space == 'grayscale':
+        palette = 'xterm'
+    else:
+        palette = 'cube6_xterm'
 
-                yield pct, color
+    for pct, color in colormap.thresholds(palette):
+        yield pct, color.rgb
 
-        last_high = last_pct
 
-        first = False
+def gen_mem_range_gradient(xterm=None, range=None, snapshot=None):
+    if range is None:
+        range = config.settings.memory.range
 
+    if snapshot is None:
+        snapshot = _context.get_snapshot()
 
-def gen_mem_range_gradient():
     yield from (
         (
-            int((psutil.virtual_memory().total / 1024) * pct + 0.5),
+            int(snapshot.mem_total * pct + 0.5),
             color
         )
-        for pct, color in gen_pct_range_gradient(config.settings.memory.range)
+        for pct, color in gen_pct_range_gradient(range, xterm)
     )
 
 
-def get_mem_free_color_range():
+def get_mem_free_color_range(xterm=None, range=None, snapshot=None):
     return '; '.join([
         '; el'.join(
             '; '.join([
@@ -392,25 +362,33 @@ def get_mem_free_color_range():
                 'then echo "{color}"'
             ]).format(
                 threshold=threshold,
-                color=get_fore_color(color)
+                color=ansi.to_bash(get_fore_color(color, xterm))
+            )
+            for threshold, color in reversed(
+                list(gen_mem_range_gradient(xterm, range, snapshot))
             )
-            for threshold, color in reversed(list(gen_mem_range_gradient()))
         ),
         'fi'
     ])
 
 
-def gen_swap_range_gradient():
+def gen_swap_range_gradient(xterm=None, range=None, snapshot=None):
+    if range is None:
+        range = config.settings.swap.range
+
+    if snapshot is None:
+        snapshot = _context.get_snapshot()
+
     yield from (
         (
-            int((psutil.swap_memory().total / 1024) * pct + 0.5),
+            int(snapshot.swap_total * pct + 0.5),
             color
         )
-        for pct, color in gen_pct_range_gradient(config.settings.swap.range)
+        for pct, color in gen_pct_range_gradient(range, xterm)
     )
 
 
-def get_swap_free_color_range():
+def get_swap_free_color_range(xterm=None, range=None, snapshot=None):
     return '; '.join([
         '; el'.join(
             '; '.join([
@@ -418,24 +396,35 @@ def get_swap_free_color_range():
                 'then echo "{color}"'
             ]).format(
                 threshold=threshold,
-                color=get_fore_color(color)
+                color=ansi.to_bash(get_fore_color(color, xterm))
+            )
+            for threshold, color in reversed(
+                list(gen_swap_range_gradient(xterm, range, snapshot))
             )
-            for threshold, color in reversed(list(gen_swap_range_gradient()))
         ),
         'fi'
     ])
 
 
-def gen_load_range_gradient(name):
+def gen_load_range_gradient(name, xterm=None, range=None, snapshot=None):
+    if range is None:
+        range = config.settings.sys.load[name].back
+
+    if snapshot is None:
+        snapshot = _context.get_snapshot()
+
     yield from (
-        (multiprocessing.cpu_count() * (1.0 - pct), color)
-        for pct, color in gen_pct_range_gradient(
-            config.settings.sys.load[name].back
-        )
+        (snapshot.cpu_count * (1.0 - pct), color)
+        for pct, color in gen_pct_range_gradient(range, xterm)
     )
 
 
-def get_load_avg_color_range(mins):
+def get_load_avg_color_range(
+    mins,
+    xterm=None,
+    range=None,
+    snapshot=None
+):
     name = 'avg_{mins}m'.format(mins=mins)
     return '; '.join([
         '; el'.join(
@@ -457,444 +446,590 @@ def get_load_avg_color_range(mins):
             ]).format(
                 mins=mins,
                 threshold=threshold,
-                back_color=get_back_color(color)
+                back_color=ansi.to_bash(get_back_color(color, xterm))
+            )
+            for threshold, color in gen_load_range_gradient(
+                name,
+                xterm,
+                range,
+                snapshot
             )
-            for threshold, color in gen_load_range_gradient(name)
         ),
         'fi'
     ])
 
 
-class Prompt(config.Base):
-    def __init__(self):
-        self.bad_names |= {
-            'color_wrap',
-            'non_printing',
-            'wrap',
-        }
+segments = _segments.SegmentRegistry()
+
+COLOR_SEGMENTS = (
+    ('at_color', 'at_symbol', 'The color to use for the at symbol'),
+    ('colon_color', 'colon', 'The color to use for the colon symbol'),
+    ('dirname_color', 'dirname', 'The color to use for the current dirname'),
+    (
+        'basename_color',
+        'basename',
+        'The color to use for the current basename'
+    ),
+    (
+        'good_fore_color',
+        'test.good.fore',
+        'The text color to use when the previous command succeeded.'
+    ),
+    (
+        'good_back_color',
+        'test.good.back',
+        'The back color to use when the previous command succeeded.'
+    ),
+    (
+        'bad_fore_color',
+        'test.bad.fore',
+        'The text color to use when the previous command failed.'
+    ),
+    (
+        'bad_back_color',
+        'test.bad.back',
+        'The back color to use when the previous command failed.'
+    ),
+)
+
+TEXT_SEGMENTS = (
+    (
+        'mem_total',
+        MEM_TOTAL,
+        'memory.total',
+        'Gets the memory total component for the prompt.'
+    ),
+    (
+        'mem_sep',
+        MEM_SEP,
+        'memory.sep',
+        'Gets the separator for memory components for the prompt.'
+    ),
+    (
+        'mem_units',
+        MEM_UNITS,
+        'memory.units',
+        'Gets the units for memory components for the prompt.'
+    ),
+    (
+        'swap_total',
+        SWAP_TOTAL,
+        'swap.total',
+        'Gets the swap total component for the prompt.'
+    ),
+    (
+        'swap_sep',
+        SWAP_SEP,
+        'swap.sep',
+        'Gets the separator for swap components for the prompt.'
+    ),
+    (
+        'swap_units',
+        SWAP_UNITS,
+        'swap.units',
+        'Gets the units for swap components for the prompt.'
+    ),
+    (
+        'cur_procs',
+        CUR_PROCS,
+        'sys.procs.current',
+        'Gets the current processes component for the prompt.'
+    ),
+    (
+        'ttl_procs',
+        TTL_PROCS,
+        'sys.procs.total',
+        'Gets the total processes component for the prompt.'
+    ),
+    (
+        'sep_procs',
+        PROCS_SEP,
+        'sys.procs.sep',
+        'Gets the separator for processes components for the prompt.'
+    ),
+    (
+        'last_pid',
+        LAST_PID,
+        'sys.last_pid',
+        'Gets the last PID component for the prompt.'
+    ),
+)
+
+JOIN_SEGMENTS = (
+    (
+        'user_host_path',
+        '',
+        ('user_host', 'colon', 'full_path'),
+        'Gets the username@hostname:/path component for the prompt.'
+    ),
+    (
+        'memory',
+        '',
+        ('mem_free', 'mem_sep', 'mem_total', 'mem_units'),
+        'Gets the memory free/total component for the prompt.'
+    ),
+    (
+        'swap',
+        '',
+        ('swap_free', 'swap_sep', 'swap_total', 'swap_units'),
+        'Gets the swap free/total component for the prompt.'
+    ),
+    (
+        'mem_swap',
+        ' ',
+        ('memory', 'swap'),
+        'Gets the combined memory & swap components for the prompt.'
+    ),
+    (
+        'load_avg',
+        SYS_SEP,
+        ('load1', 'load5', 'load15'),
+        'Gets the combined Avg Load component for the prompt.'
+    ),
+    (
+        'procs',
+        '',
+        ('cur_procs', 'sep_procs', 'ttl_procs'),
+        'Gets the combined processes component for the prompt.'
+    ),
+    (
+        'sys',
+        SYS_SEP,
+        ('load_avg', 'procs', 'last_pid'),
+        'Gets the combined system information component for the prompt.'
+    ),
+    (
+        'mem_sys',
+        MEM_SYS_SEP,
+        ('mem_swap', 'sys'),
+        'Gets the memory & system information component for the prompt.'
+    ),
+)
+
+LOAD_SEGMENTS = (
+    ('load1', 1, LOAD_1M_FORMAT, LOAD_1M),
+    ('load5', 5, LOAD_5M_FORMAT, LOAD_5M),
+    ('load15', 15, LOAD_15M_FORMAT, LOAD_15M),
+)
+
+
+def register_color_segment(name, path, doc):
+    segments.register(name, inputs={'value': path}, text=False, doc=doc)(
+        lambda prompt, value: get_color_from_config(value)
+    )
 
-        self.register_attr(
-            'usercolor',
-            lambda: (
-                get_color_from_config(
-                    config.settings.user.super[USERDATA.pw_name]
-                )
-                if SUPER
-                else get_color_from_config(
-                    config.settings.user.normal[USERDATA.pw_name]
-                )
-            ),
-            'The color to use for the current user'
-        )
 
-        self.register_attr(
-            'at_color',
-            lambda: get_color_from_config(config.settings.at_symbol),
-            'The color to use for the at symbol'
+def register_text_segment(name, text, path, doc):
+    segments.register(name, inputs={'value': path}, doc=doc)(
+        lambda prompt, value: prompt.color_wrap(
+            text,
+            get_color_from_config(value)
         )
+    )
 
-        self.register_attr(
-            'hostcolor',
-            lambda: (
-                get_color_from_config(
-                    config.settings.server[HOSTNAME].super
-                )
-                if SUPER
-                else get_color_from_config(
-                    config.settings.server[HOSTNAME].normal
+
+def register_join_segment(name, sep, deps, doc):
+    segments.register(name, deps=deps, doc=doc)(
+        lambda prompt, **parts: sep.join(parts[dep] for dep in deps)
+    )
+
+
+def register_load_segment(name, mins, range_format, text):
+    path = 'sys.load.avg_{mins}m'.format(mins=mins)
+
+    segments.register(
+        name,
+        inputs={'load': path},
+        metrics=('cpu_count',),
+        doc='Gets the Avg Load {mins}m component for the prompt.'.format(
+            mins=mins
+        )
+    )(
+        lambda prompt, load, snapshot: ' '.join([
+            prompt.wrap(
+                ' ',
+                range_format.format(
+                    color_range=get_load_avg_color_range(
+                        mins,
+                        prompt.xterm,
+                        load.back,
+                        snapshot
+                    )
                 )
             ),
-            'The color to use for the hostname'
-        )
+            prompt.color_wrap(text, get_color_from_config(load.fore)),
+        ])
+    )
 
-        self.register_attr(
-            'colon_color',
-            lambda: get_color_from_config(config.settings.colon),
-            'The color to use for the colon symbol'
-        )
 
-        self.register_attr(
-            'dirname_color',
-            lambda: get_color_from_config(config.settings.dirname),
-            'The color to use for the current dirname'
-        )
+for entry in COLOR_SEGMENTS:
+    register_color_segment(*entry)
 
-        self.register_attr(
-            'basename_color',
-            lambda: get_color_from_config(config.settings.basename),
-            'The color to use for the current basename'
-        )
+for entry in TEXT_SEGMENTS:
+    register_text_segment(*entry)
 
-        self.register_attr(
-            'good_fore_color',
-            lambda: get_color_from_config(config.settings.test.good.fore),
-            'The text color to use when the previous command succeeded.'
-        )
+for entry in JOIN_SEGMENTS:
+    register_join_segment(*entry)
 
-        self.register_attr(
-            'good_back_color',
-            lambda: get_color_from_config(config.settings.test.good.back),
-            'The back color to use when the previous command succeeded.'
-        )
+for entry in LOAD_SEGMENTS:
+    register_load_segment(*entry)
 
-        self.register_attr(
-            'bad_fore_color',
-            lambda: get_color_from_config(config.settings.test.bad.fore),
-            'The text color to use when the previous command failed.'
-        )
 
-        self.register_attr(
-            'bad_back_color',
-            lambda: get_color_from_config(config.settings.test.bad.back),
-            'The back color to use when the previous command failed.'
-        )
+@segments.register(
+    'usercolor',
+    text=False,
+    inputs={'users': 'user'},
+    doc='The color to use for the current user'
+)
+def usercolor(prompt, users):
+    if prompt.context.superuser:
+        return get_color_from_config(users.super[prompt.context.user])
 
-        self.register_attr(
-            'test_good',
-            lambda: get_color(self.good_fore_color, self.good_back_color),
-            ' '.join([
-                'The complete color configuration for when',
-                'the previous command succeeded'
-            ])
-        )
+    else:
+        return get_color_from_config(users.normal[prompt.context.user])
 
-        self.register_attr(
-            'test_bad',
-            lambda: get_color(self.bad_fore_color, self.bad_back_color),
-            ' '.join([
-                'The complete color configuration for when',
-                'the previous command failed'
-            ])
-        )
 
-        self.register_attr(
-            'test_color',
-            lambda: TEST_FORMAT.format(
-                color_good=self.test_good,
-                color_bad=self.test_bad
-            ),
-            'Returns the complete color setting for previous command test'
-        )
+@segments.register(
+    'hostcolor',
+    text=False,
+    inputs={'servers': 'server'},
+    doc='The color to use for the hostname'
+)
+def hostcolor(prompt, servers):
+    if prompt.context.superuser:
+        return get_color_from_config(servers[prompt.context.host].super)
 
-        self.register_attr(
-            'test',
-            lambda: ''.join([
-                self.wrap(
-                    PROMPT_SYMBOL,
-                    self.test_color
-                ),
-                ' '
-            ])
-        )
+    else:
+        return get_color_from_config(servers[prompt.context.host].normal)
 
-        self.register_attr(
-            'reset_colors',
-            lambda: (
-                ansi.seq.ResetColorText()
-                + ansi.seq.ResetColorBack()
-                + ansi.seq.Reset()
-            )
-        )
 
-        self.register_attr(
-            'user_host',
-            lambda: (
-                self.color_wrap(
-                    ''.join([USER, AT, HOST]),
-                    self.usercolor,
-                    self.hostcolor
-                )
-                if SUPER
-                else ''.join([
-                    self.color_wrap(USER, self.usercolor),
-                    self.color_wrap(AT, self.at_color),
-                    self.color_wrap(HOST, self.hostcolor),
-                ])
-            ),
-            'Gets the username@hostname component for the prompt.'
-        )
+@segments.register(
+    'test_good',
+    deps=('good_fore_color', 'good_back_color'),
+    text=False,
+    doc=' '.join([
+        'The complete color configuration for when',
+        'the previous command succeeded'
+    ])
+)
+def test_good(prompt, good_fore_color, good_back_color):
+    return get_color(good_fore_color, good_back_color, prompt.xterm)
+
+
+@segments.register(
+    'test_bad',
+    deps=('bad_fore_color', 'bad_back_color'),
+    text=False,
+    doc=' '.join([
+        'The complete color configuration for when',
+        'the previous command failed'
+    ])
+)
+def test_bad(prompt, bad_fore_color, bad_back_color):
+    return get_color(bad_fore_color, bad_back_color, prompt.xterm)
+
+
+@segments.register(
+    'test_color',
+    deps=('test_good', 'test_bad'),
+    doc='Returns the complete color setting for previous command test'
+)
+def test_color(prompt, test_good, test_bad):
+    return TEST_FORMAT.format(
+        color_good=ansi.to_bash(test_good),
+        color_bad=ansi.to_bash(test_bad)
+    )
 
-        self.register_attr(
-            'colon',
-            lambda: self.wrap(
-                COLON,
-                ansi.seq.Bold() + get_color(self.colon_color)
-            ),
-            'Gets the colon component for the prompt.'
-        )
 
-        self.register_attr(
-            'full_path',
-            lambda: ''.join([
-                self.color_wrap(DIRNAME, self.dirname_color),
-                self.wrap(
-                    BASENAME,
-                    ansi.seq.Bold() + get_color(self.basename_color)
-                ),
-            ])
-        )
+@segments.register(
+    'test',
+    deps=('test_color',),
+    doc='Gets the previous command test component for the prompt.'
+)
+def test(prompt, test_color):
+    return ''.join([
+        prompt.wrap(
+            PROMPT_SYMBOL,
+            test_color
+        ),
+        ' '
+    ])
 
-        self.register_attr(
-            'user_host_path',
-            lambda: ''.join([
-                self.user_host,
-                self.colon,
-                self.full_path,
-            ]),
-            'Gets the username@hostname:/path component for the prompt.'
-        )
 
-        self.register_attr(
-            'mem_free',
-            lambda: self.wrap(
-                MEM_FREE,
-                MEM_FORMAT.format(
-                    print_line='{print $4}',
-                    color_range=get_mem_free_color_range()
-                )
-            ),
-            'Gets the memory free component for the prompt.'
+@segments.register(
+    'user_host',
+    deps=('usercolor', 'at_color', 'hostcolor'),
+    doc='Gets the username@hostname component for the prompt.'
+)
+def user_host(prompt, usercolor, at_color, hostcolor):
+    if prompt.context.superuser:
+        return prompt.color_wrap(
+            ''.join([USER, AT, HOST]),
+            usercolor,
+            hostcolor
         )
 
-        self.register_attr(
-            'mem_total',
-            lambda: self.color_wrap(
-                MEM_TOTAL,
-                get_color_from_config(config.settings.memory.total)
-            ),
-            'Gets the memory total component for the prompt.'
-        )
+    else:
+        return ''.join([
+            prompt.color_wrap(USER, usercolor),
+            prompt.color_wrap(AT, at_color),
+            prompt.color_wrap(HOST, hostcolor),
+        ])
 
-        self.register_attr(
-            'mem_sep',
-            lambda: self.color_wrap(
-                MEM_SEP,
-                get_color_from_config(config.settings.memory.sep)
-            ),
-            'Gets the separator for memory components for the prompt.'
-        )
 
-        self.register_attr(
-            'mem_units',
-            lambda: self.color_wrap(
-                MEM_UNITS,
-                get_color_from_config(config.settings.memory.units)
-            ),
-            'Gets the units for memory components for the prompt.'
-        )
+@segments.register(
+    'colon',
+    deps=('colon_color',),
+    doc='Gets the colon component for the prompt.'
+)
+def colon(prompt, colon_color):
+    return prompt.wrap(
+        COLON,
+        ansi.seq.Bold() + get_color(colon_color, xterm=prompt.xterm)
+    )
 
-        self.register_attr(
-            'memory',
-            lambda: ''.join([
-                self.mem_free,
-                self.mem_sep,
-                self.mem_total,
-                self.mem_units,
-            ]),
-            'Gets the memory free/total component for the prompt.'
-        )
 
-        self.register_attr(
-            'swap_free',
-            lambda: self.wrap(
-                SWAP_FREE,
-                SWAP_FORMAT.format(
-                    print_line='{print $4}',
-                    color_range=get_swap_free_color_range()
-                )
-            ),
-            'Gets the swap free component for the prompt.'
+@segments.register(
+    'full_path',
+    deps=('dirname_color', 'basename_color'),
+    doc='Gets the dirname & basename component for the prompt.'
+)
+def full_path(prompt, dirname_color, basename_color):
+    return ''.join([
+        prompt.color_wrap(DIRNAME, dirname_color),
+        prompt.wrap(
+            BASENAME,
+            ansi.seq.Bold() + get_color(basename_color, xterm=prompt.xterm)
+        ),
+    ])
+
+
+@segments.register(
+    'mem_free',
+    inputs={'range': 'memory.range'},
+    metrics=('mem_total',),
+    doc='Gets the memory free component for the prompt.'
+)
+def mem_free(prompt, range, snapshot):
+    return prompt.wrap(
+        MEM_FREE,
+        MEM_FORMAT.format(
+            print_line='{print $4}',
+            color_range=get_mem_free_color_range(
+                prompt.xterm,
+                range,
+                snapshot
+            )
         )
+    )
 
-        self.register_attr(
-            'swap_total',
-            lambda: self.color_wrap(
-                SWAP_TOTAL,
-                get_color_from_config(config.settings.swap.total)
-            ),
-            'Gets the swap total component for the prompt.'
+
+@segments.register(
+    'swap_free',
+    inputs={'range': 'swap.range'},
+    metrics=('swap_total',),
+    doc='Gets the swap free component for the prompt.'
+)
+def swap_free(prompt, range, snapshot):
+    return prompt.wrap(
+        SWAP_FREE,
+        SWAP_FORMAT.format(
+            print_line='{print $4}',
+            color_range=get_swap_free_color_range(
+                prompt.xterm,
+                range,
+                snapshot
+            )
         )
+    )
+
+
+class Prompt(config.Base):
+    def __init__(self, context=None, xterm=None, workers=None, metrics=None):
+        self.bad_names |= {
+            'color_wrap',
+            'emit_into',
+            'evaluate',
+            'non_printing',
+            'optimize',
+            'render',
+            'segment_results',
+            'wrap',
+        }
+        self.trace_path = ('prompt',)
 
         self.register_attr(
-            'swap_sep',
-            lambda: self.color_wrap(
-                SWAP_SEP,
-                get_color_from_config(config.settings.swap.sep)
-            ),
-            'Gets the separator for swap components for the prompt.'
+            'metrics',
+            lambda value: _context.get_metrics() if value is None else value,
+            ' '.join([
+                'The backend the system metrics are read from: proc, psutil',
+                'or a fixture of recorded snapshots.'
+            ]),
+            setable=True
         )
+        self.metrics = metrics
 
         self.register_attr(
-            'swap_units',
-            lambda: self.color_wrap(
-                SWAP_UNITS,
-                get_color_from_config(config.settings.swap.units)
+            'context',
+            lambda value: (
+                _context.RenderContext.from_environ(metrics=self.metrics)
+                if value is None
+                else value
             ),
-            'Gets the units for swap components for the prompt.'
+            ' '.join([
+                'The user, host, terminal and system totals the prompt is',
+                'rendered for.'
+            ]),
+            setable=True
         )
+        self.context = context
 
         self.register_attr(
-            'swap',
-            lambda: ''.join([
-                self.swap_free,
-                self.swap_sep,
-                self.swap_total,
-                self.swap_units,
-            ]),
-            'Gets the swap free/total component for the prompt.'
+            'xterm',
+            lambda value: self.context.xterm if value is None else value,
+            'Whether the prompt targets a 256-color xterm.',
+            setable=True
         )
+        self.xterm = xterm
 
         self.register_attr(
-            'mem_swap',
-            lambda: ' '.join([
-                self.memory,
-                self.swap,
+            'workers',
+            lambda value: (
+                value
+                if value is not None
+                else config.settings.segment_workers
+                if 'segment_workers' in config.settings
+                else 1
+            ),
+            ' '.join([
+                'The number of threads used to evaluate independent',
+                'segments of the layout; 1 evaluates them serially.'
             ]),
-            'Gets the combined memory & swap components for the prompt.'
+            setable=True
         )
+        self.workers = workers
 
         self.register_attr(
-            'load1',
-            lambda: ' '.join([
-                self.wrap(
-                    ' ',
-                    LOAD_1M_FORMAT.format(
-                        color_range=get_load_avg_color_range(1)
-                    )
-                ),
-                self.color_wrap(
-                    LOAD_1M,
-                    get_color_from_config(
-                        config.settings.sys.load['avg_1m'].fore
-                    )
-                ),
-            ]),
-            'Gets the Avg Load 1m component for the prompt.'
+            'segment_results',
+            lambda: {},
+            'The segments evaluated so far, by name.'
         )
 
         self.register_attr(
-            'load5',
-            lambda: ' '.join([
-                self.wrap(
-                    ' ',
-                    LOAD_5M_FORMAT.format(
-                        color_range=get_load_avg_color_range(5)
-                    )
-                ),
-                self.color_wrap(
-                    LOAD_5M,
-                    get_color_from_config(
-                        config.settings.sys.load['avg_5m'].fore
-                    )
-                ),
-            ]),
-            'Gets the Avg Load 5m component for the prompt.'
+            'segment_timings',
+            lambda: {},
+            'The time in seconds each evaluated segment took, by name.'
         )
 
         self.register_attr(
-            'load15',
-            lambda: ' '.join([
-                self.wrap(
-                    ' ',
-                    LOAD_15M_FORMAT.format(
-                        color_range=get_load_avg_color_range(15)
-                    )
-                ),
-                self.color_wrap(
-                    LOAD_15M,
-                    get_color_from_config(
-                        config.settings.sys.load['avg_15m'].fore
-                    )
-                ),
-            ]),
-            'Gets the Avg Load 15m component for the prompt.'
+            'segment_cache',
+            lambda: _segments.get_cache(),
+            ' '.join([
+                'The on-disk cache of segment outputs, keyed by the settings',
+                'and prompt attributes each segment read, or None.'
+            ])
         )
 
+        for segment in segments:
+            self.register_attr(
+                segment.name,
+                functools.partial(self.evaluate, segment.name),
+                segment.doc
+            )
+
         self.register_attr(
-            'load_avg',
-            lambda: SYS_SEP.join([
-                self.load1,
-                self.load5,
-                self.load15
-            ]),
-            'Gets the combined Avg Load component for the prompt.'
+            'reset_colors',
+            lambda: (
+                ansi.seq.ResetColorText()
+                + ansi.seq.ResetColorBack()
+                + ansi.seq.Reset()
+            )
         )
 
         self.register_attr(
-            'cur_procs',
-            lambda: self.color_wrap(
-                CUR_PROCS,
-                get_color_from_config(config.settings.sys.procs.current)
+            'template',
+            lambda: (
+                config.settings.template
+                if 'template' in config.settings
+                else TEMPLATE
             ),
-            'Gets the current processes component for the prompt.'
+            ' '.join([
+                'The prompt layout: literal text with {segment} or',
+                '{segment:color} fields.'
+            ])
         )
 
         self.register_attr(
-            'ttl_procs',
-            lambda: self.color_wrap(
-                TTL_PROCS,
-                get_color_from_config(config.settings.sys.procs.total)
-            ),
-            'Gets the total processes component for the prompt.'
+            'plan',
+            lambda: segments.compile(self.template),
+            'The compiled render plan for the template.'
         )
 
         self.register_attr(
-            'sep_procs',
-            lambda: self.color_wrap(
-                PROCS_SEP,
-                get_color_from_config(config.settings.sys.procs.sep)
-            ),
-            'Gets the separator for processes components for the prompt.'
+            'layout',
+            lambda: self.plan.roots,
+            'The segments referenced by the template.'
         )
 
         self.register_attr(
-            'procs',
-            lambda: ''.join([
-                self.cur_procs,
-                self.sep_procs,
-                self.ttl_procs
-            ]),
-            'Gets the combined processes component for the prompt.'
+            'snapshot',
+            lambda: self.context.get_snapshot(self.metrics),
+            'The system metrics shared by every segment of this render.'
         )
 
         self.register_attr(
-            'last_pid',
-            lambda: self.color_wrap(
-                LAST_PID,
-                get_color_from_config(config.settings.sys.last_pid)
-            ),
-            'Gets the last PID component for the prompt.'
+            'raw_prompt',
+            lambda: self.render(),
+            'Gets the complete prompt before SGR optimization.'
         )
 
         self.register_attr(
-            'sys',
-            lambda: SYS_SEP.join([
-                self.load_avg,
-                self.procs,
-                self.last_pid,
-            ]),
-            'Gets the combined system information component for the prompt.'
+            'optimized_prompt',
+            lambda: self.optimize(self.raw_prompt),
+            'Gets the SGR optimization result for the complete prompt.'
         )
 
         self.register_attr(
-            'mem_sys',
-            lambda: MEM_SYS_SEP.join([
-                self.mem_swap,
-                self.sys
-            ]),
-            'Gets the memory & system information component for the prompt.'
+            'sgr_savings',
+            lambda: self.optimized_prompt.saved,
+            'Gets the number of escape bytes removed by SGR optimization.'
         )
 
         self.register_attr(
             'prompt',
-            lambda: '\n'.join([
-                self.mem_sys,
-                self.user_host_path,
-                self.test
-            ]).replace('\033', r'\e'),
+            lambda: self.optimized_prompt.text,
             'Gets the complete prompt.'
         )
 
+    def render(self):
+        if segments.metrics(self.layout):
+            self.snapshot
+
+        return segments.render(
+            self.plan,
+            self,
+            self.segment_results,
+            workers=self.workers,
+            timings=self.segment_timings,
+            cache=self.segment_cache
+        )
+
+    def optimize(self, raw):
+        optimize = functools.partial(ansi.optimize_sgr, bash=True)
+
+        if self.segment_cache is None:
+            return optimize(raw)
+
+        return self.segment_cache.finish(raw, optimize)
+
+    def evaluate(self, name):
+        return segments.evaluate(
+            [name],
+            self,
+            self.segment_results,
+            timings=self.segment_timings
+        )[name]
+
     def wrap(self, text, start, end=None):
         if end is None:
             end = self.reset_colors
@@ -906,17 +1041,47 @@ class Prompt(config.Base):
         ])
 
     def color_wrap(self, text, fore=None, back=None):
-        return self.wrap(text, get_color(fore=fore, back=back))
+        return self.wrap(
+            text,
+            get_color(fore=fore, back=back, xterm=self.xterm)
+        )
 
     @staticmethod
     def non_printing(sequence):
-        return ''.join(['\\[', str(sequence), '\\]'])
+        return ''.join(['\\[', ansi.to_bash(sequence), '\\]'])
+
+    def emit_into(self, out):
+        sink = ansi.get_sink(out)
+        sink.write(self.prompt.encode('utf-8'))
+        sink.write(b'\n')
+
+        return sink
 
     @classmethod
-    def get_prompt(cls):
-        prompt = cls()
+    def dual_prompt(cls, context=None):
+        if context is None:
+            context = _context.RenderContext.from_environ()
+
+        return DUAL_FORMAT.format(
+            xterm=shlex.quote(cls(context, xterm=True).prompt),
+            ansi=shlex.quote(cls(context, xterm=False).prompt)
+        )
+
+    @classmethod
+    def get_prompt(cls, dual=False, context=None):
+        if dual:
+            sys.stdout.buffer.write(cls.dual_prompt(context).encode('utf-8'))
+            sys.stdout.buffer.write(b'\n')
+
+        else:
+            cls(context).emit_into(sys.stdout.buffer)
+
+        sys.stdout.buffer.flush()
+
+        _specs.get_resolver().save()
 
-        print(prompt.prompt)
+        if _segments.get_cache() is not None:
+            _segments.get_cache().save()
 
 
 if __name__ == '__main__':
@@ -130,7 +130,7 @@ setup(
 
     entry_points={
         'console_scripts': [
-            'prompter = prompter.make_prompt:Prompt.get_prompt',
+            'prompter = prompter.__main__:main',
         ]
     },
 )
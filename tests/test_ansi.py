@@ -0,0 +1,62 @@
+import unittest
+
+from prompter import _ansi
+
+BARRIER = r'\[$(echo)\]'
+
+
+def optimize(text):
+    return _ansi.optimize_sgr(text, bash=True).text
+
+
+class OptimizeSgrTest(unittest.TestCase):
+    def test_xterm_color_zero_is_not_a_reset(self):
+        for text in [
+            r'\[\e[38;5;0m\]B',
+            r'\[\e[48;5;0m\]B',
+            r'\[\e[38;5;0m\e[48;5;0m\]B',
+        ]:
+            with self.subTest(text=text):
+                self.assertNotIn(r'\e[0;', optimize(BARRIER + 'A' + text))
+
+    def test_color24_zero_is_not_a_reset(self):
+        self.assertEqual(
+            optimize(BARRIER + r'A\[\e[38;2;255;0;0m\]B'),
+            BARRIER + r'A\[\e[38;2;255;0;0m\]B'
+        )
+
+    def test_color24_zero_keeps_known_state_short(self):
+        self.assertEqual(
+            optimize(r'\[\e[1m\]A\[\e[38;2;255;0;0m\]B'),
+            r'\[\e[1m\]A\[\e[38;2;255;0;0m\]B'
+        )
+
+    def test_real_reset_after_barrier(self):
+        self.assertEqual(
+            optimize(BARRIER + r'A\[\e[1;0;4m\]B\[\e[m\]C'),
+            BARRIER + r'A\[\e[0;4m\]B\[\e[0m\]C'
+        )
+
+    def test_sgr_commands(self):
+        self.assertEqual(
+            _ansi.sgr_commands([0, 38, 5, 0, 48, 2, 0, 0, 0, 1]),
+            [(0,), (38, 5, 0), (48, 2, 0, 0, 0), (1,)]
+        )
+
+
+class TitleTextTest(unittest.TestCase):
+    def test_non_ascii_passes_through(self):
+        self.assertEqual(
+            _ansi.title_text('hôst:~/dïr/世界'),
+            (0, 'hôst:~/dïr/世界')
+        )
+
+    def test_control_characters_are_escaped(self):
+        self.assertEqual(
+            _ansi.title_text('a\x07b\x1bc\x9b'),
+            (0, 'a\\x07b\\x1bc\\x9b')
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
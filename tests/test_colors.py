@@ -0,0 +1,68 @@
+import itertools
+import unittest
+
+from prompter import _colors
+
+
+class ConversionTest(unittest.TestCase):
+    def test_cube6_xterm_matches_rgb_route(self):
+        for cell in itertools.product(range(6), repeat=3):
+            cube = _colors.Cube6XtermColor(*cell)
+
+            with self.subTest(cell=cell):
+                self.assertEqual(
+                    cube.xterm,
+                    _colors.XtermColor.from_rgb(cube.rgb)
+                )
+
+    def test_cube6_xterm_corners_prefer_system_colors(self):
+        self.assertEqual(_colors.Cube6XtermColor(0, 0, 0).xterm.index, 0)
+        self.assertEqual(_colors.Cube6XtermColor(5, 5, 5).xterm.index, 15)
+        self.assertEqual(_colors.Cube6XtermColor(0, 0, 1).xterm.index, 17)
+
+
+class ColormapTest(unittest.TestCase):
+    def setUp(self):
+        self.colormap = _colors.Colormap({
+            0: _colors.RGBColor(255, 0, 0),
+            10: _colors.RGBColor(255, 255, 0),
+            50: _colors.RGBColor(0, 255, 0),
+        })
+
+    def test_thresholds_keep_stop_positions(self):
+        for palette in ['cube6_xterm', 'ansi', 'rgb']:
+            with self.subTest(palette=palette):
+                thresholds = dict(self.colormap.thresholds(palette))
+
+                for pct, color in self.colormap.stops:
+                    self.assertEqual(
+                        thresholds[pct / 100],
+                        _colors.conversions.convert(color, palette)
+                    )
+
+    def test_thresholds_follow_the_table(self):
+        thresholds = self.colormap.thresholds('cube6_xterm')
+
+        self.assertEqual(len(thresholds), 11)
+
+        for (pct, color), (next_pct, next_color) in zip(
+            thresholds[:-1],
+            thresholds[1:]
+        ):
+            self.assertLess(pct, next_pct)
+            self.assertNotEqual(color, next_color)
+            self.assertEqual(self.colormap(pct, 'cube6_xterm'), color)
+
+    def test_lookup_clamps_to_the_table(self):
+        self.assertEqual(
+            self.colormap(-1, 'ansi'),
+            self.colormap(0, 'ansi')
+        )
+        self.assertEqual(
+            self.colormap(2, 'ansi'),
+            self.colormap.table('ansi')[-1]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from prompter import _metrics
+
+
+class ProcBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+
+    def write(self, name, text):
+        with open(os.path.join(self.root.name, name), 'w') as out:
+            out.write(text)
+
+    def test_reads_past_the_buffer(self):
+        cpus = 4096
+        self.write('stat', ''.join(
+            ['cpu  1 2 3 4 5 6 7 8 9 10\n'] + [
+                'cpu{ndx} 1 2 3 4 5 6 7 8 9 10\n'.format(ndx=ndx)
+                for ndx in range(cpus)
+            ] + ['intr 1\n']
+        ))
+        backend = _metrics.ProcBackend(self.root.name)
+
+        self.assertGreater(
+            os.path.getsize(os.path.join(self.root.name, 'stat')),
+            _metrics.BUFFER_SIZE
+        )
+        self.assertEqual(backend.cpu_count(), cpus)
+
+    def test_meminfo(self):
+        self.write('meminfo', 'MemTotal: 2048 kB\nMemFree: 1024 kB\n')
+        backend = _metrics.ProcBackend(self.root.name)
+
+        self.assertEqual(
+            backend.meminfo(),
+            {b'MemTotal': 2048, b'MemFree': 1024}
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from prompter import _colors
+from prompter import _config
+from prompter import _segments
+from prompter import config
+
+
+class Context(config.Base):
+    def __init__(self, palette):
+        self.trace_path = ('prompt',)
+
+        self.register_attr('palette', lambda: config.to_config(palette))
+
+
+class SegmentCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = _segments.SegmentRegistry()
+        self.calls = []
+
+        @self.registry.register('fg')
+        def fg(context):
+            self.calls.append(context)
+
+            return context.palette['fg']
+
+        @self.registry.register('bg')
+        def bg(context):
+            return context.palette.get('bg', 'default')
+
+    def render(self, cache, palette, name='fg'):
+        context = Context(palette)
+
+        # Load the values up front, so that the segment only sees them
+        # through the already-loaded path of the accessors.
+        list(context.palette.items())
+
+        return self.registry.evaluate([name], context, cache=cache)[name]
+
+    def test_changed_setting_is_recomputed(self):
+        cache = _segments.SegmentCache()
+
+        self.assertEqual(self.render(cache, {'fg': 'Red'}), 'Red')
+        self.assertEqual(self.render(cache, {'fg': 'Blue'}), 'Blue')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_unchanged_setting_is_reused(self):
+        cache = _segments.SegmentCache()
+
+        self.render(cache, {'fg': 'Red'})
+        self.assertEqual(self.render(cache, {'fg': 'Red'}), 'Red')
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(cache.reused, {'fg'})
+
+    def test_missing_key_is_recomputed(self):
+        cache = _segments.SegmentCache()
+
+        self.assertEqual(self.render(cache, {}, 'bg'), 'default')
+        self.assertEqual(self.render(cache, {'bg': 'Red'}, 'bg'), 'Red')
+
+    def test_color_state_change_drops_entries(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = _segments.SegmentCache(cache_dir, 'channel')
+            self.render(cache, {'fg': 'Red'})
+            cache.save()
+
+            self.assertIn(
+                'fg',
+                _segments.SegmentCache(cache_dir, 'channel').entries
+            )
+            self.assertEqual(
+                _segments.SegmentCache(cache_dir, 'oklab').entries,
+                {}
+            )
+
+    def test_color_state_follows_color_match(self):
+        _colors.color_state.cache_clear()
+        self.addCleanup(_colors.color_state.cache_clear)
+
+        with mock.patch.object(_colors, 'get_match_mode', lambda: 'channel'):
+            channel = _colors.color_state()
+
+        _colors.color_state.cache_clear()
+
+        with mock.patch.object(_colors, 'get_match_mode', lambda: 'oklab'):
+            oklab = _colors.color_state()
+
+        self.assertNotEqual(channel, oklab)
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_equal_tuples_share_a_fingerprint(self):
+        self.assertEqual(
+            _config.fingerprint((0, 50, 10)),
+            _config.fingerprint(tuple([0, 50, 10]))
+        )
+        self.assertNotEqual(
+            _config.fingerprint((0, 50, 10)),
+            _config.fingerprint((0, 50))
+        )
+
+    def test_tuples_of_config_nodes(self):
+        value = config.to_config([{'fg': 'Red'}])
+
+        self.assertEqual(_config.fingerprint(value), "[{'fg': 'Red'}]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from prompter import make_prompt
+
+
+class CompileTemplateTest(unittest.TestCase):
+    def compile(self, template):
+        return make_prompt.segments.compile(template)
+
+    def test_text_segments(self):
+        plan = self.compile('{mem_sys}\n{user_host_path} {mem_sep:Red}')
+
+        self.assertEqual(plan.roots, ('mem_sys', 'user_host_path', 'mem_sep'))
+
+    def test_color_segments_are_rejected(self):
+        for template in ['{at_color}', '{test_good}', '{at_color:Red}']:
+            with self.subTest(template=template):
+                with self.assertRaisesRegex(ValueError, 'produces a color'):
+                    self.compile(template)
+
+    def test_style_needs_a_value_input(self):
+        with self.assertRaisesRegex(ValueError, 'no color to style'):
+            self.compile('{test:Red}')
+
+    def test_unknown_segment(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown segment'):
+            self.compile('{no_such_segment}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import io
+import unittest
+
+from prompter import _transcode
+
+SAMPLE = b''.join([
+    b'plain \x1b[1;38;5;1mred\x1b[0m ',
+    b'\x1b[48;5;9mback\x1b[49m ',
+    b'\x1b[38;2;255;0;0mtrue\x1b[39m ',
+    b'\x1b]0;title\x07\x1b[Kdone\n',
+])
+
+
+def chunked(data, depth, chunk_size):
+    out = io.BytesIO()
+    _transcode.transcode(io.BytesIO(data), out, depth, chunk_size)
+
+    return out.getvalue()
+
+
+class TranscodeTest(unittest.TestCase):
+    def test_palette_colors_to_16(self):
+        self.assertEqual(
+            _transcode.transcode_bytes(
+                b'\x1b[1;38;5;1mA\x1b[48;5;9mB',
+                16
+            ),
+            b'\x1b[1;31mA\x1b[101mB'
+        )
+
+    def test_true_color_to_256(self):
+        self.assertEqual(
+            _transcode.transcode_bytes(b'\x1b[38;2;0;95;135mA', 256),
+            b'\x1b[38;5;24mA'
+        )
+
+    def test_escapes_split_across_chunks(self):
+        for depth in _transcode.DEPTHS:
+            whole = _transcode.transcode_bytes(SAMPLE, depth)
+            self.assertNotIn(b'38;2;', whole)
+
+            for chunk_size in range(1, len(SAMPLE) + 1):
+                with self.subTest(depth=depth, chunk_size=chunk_size):
+                    self.assertEqual(
+                        chunked(SAMPLE, depth, chunk_size),
+                        whole
+                    )
+
+    def test_partial_escape_is_held_back(self):
+        transcoder = _transcode.Transcoder(16)
+
+        self.assertEqual(transcoder.feed(b'A\x1b[38;5'), b'A')
+        self.assertEqual(transcoder.pending, b'\x1b[38;5')
+        self.assertEqual(transcoder.feed(b';1mB'), b'\x1b[31mB')
+        self.assertEqual(transcoder.pending, b'')
+
+    def test_unterminated_escape_is_flushed(self):
+        self.assertEqual(
+            _transcode.transcode_bytes(b'A\x1b[38;5', 16),
+            b'A\x1b[38;5'
+        )
+
+    def test_malformed_extended_colors_pass_through(self):
+        for depth in _transcode.DEPTHS:
+            for data in [
+                b'\x1b[38;5m',
+                b'\x1b[48;5m',
+                b'\x1b[38;5;256m',
+                b'\x1b[38;2;255;0m',
+                b'\x1b[38;7;1m',
+                b'\x1b[38m',
+            ]:
+                with self.subTest(depth=depth, data=data):
+                    self.assertEqual(
+                        _transcode.transcode_bytes(data, depth),
+                        data
+                    )
+
+    def test_table_evicts_oldest(self):
+        table = _transcode.SgrTable(16, maxsize=4)
+
+        for code in range(6):
+            table[str(code).encode('ascii')]
+
+        self.assertEqual(list(table), [b'2', b'3', b'4', b'5'])
+        self.assertEqual(table[b'38;5;1'], b'\x1b[31m')
+        self.assertNotIn(b'2', table)
+
+    def test_table_is_bounded(self):
+        transcoder = _transcode.Transcoder(16)
+        transcoder.feed(b''.join(
+            '\x1b[{code}m'.format(code=code).encode('ascii')
+            for code in range(_transcode.TABLE_SIZE + 10)
+        ))
+
+        self.assertEqual(len(transcoder.table), _transcode.TABLE_SIZE)
+
+    def test_bad_depth(self):
+        with self.assertRaises(ValueError):
+            _transcode.SgrTable(88)
+
+
+if __name__ == '__main__':
+    unittest.main()